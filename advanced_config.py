@@ -14,10 +14,13 @@ SingTool Advanced Config Module (Refactored)
 - RoutingConfigManager: 路由规则配置
 """
 
-import json
+import copy
+from datetime import datetime
+from functools import cached_property
+from pathlib import Path
 from typing import Dict, Any, List
-from utils import Colors, Logger
-from paths import PathManager
+from utils import Colors, json_loads, write_json_file
+from config.base_config import BaseConfigManager
 from config import (
     ProxyConfigManager,
     DNSConfigManager,
@@ -28,61 +31,87 @@ from config import (
 )
 
 
-class AdvancedConfigManager:
+# 默认高级配置
+_DEFAULT_ADVANCED_CONFIG = {
+    "version": "2.0",
+    "description": "SingTool高级配置文件 - 模块化设计",
+    "modules": {
+        "proxy_ports": "代理端口配置",
+        "dns": "DNS和FakeIP配置",
+        "clash_api": "Clash API配置",
+        "system_proxy": "系统代理配置",
+        "routing": "路由规则配置"
+    },
+    "last_updated": None
+}
+
+# 菜单标题
+_HDR_MEDIA = f"{Colors.CYAN}🎬 媒体分流管理{Colors.NC}"
+_HDR_APP = f"{Colors.CYAN}💻 程序分流管理{Colors.NC}"
+_HDR_OVERVIEW = f"{Colors.CYAN}📊 配置概览{Colors.NC}"
+
+
+class AdvancedConfigManager(BaseConfigManager):
     """高级配置管理类 - 协调各个配置模块"""
     
-    def __init__(self, paths: PathManager, logger: Logger):
-        self.paths = paths
-        self.logger = logger
-        self.advanced_config_file = self.paths.config_dir / "advanced.json"
-        
-        # 初始化各个配置管理器
-        self.proxy_manager = ProxyConfigManager(paths, logger)
-        self.dns_manager = DNSConfigManager(paths, logger)
-        self.tun_manager = TUNConfigManager(paths, logger)
-        self.clash_manager = ClashConfigManager(paths, logger)
-        self.system_proxy_manager = SystemProxyManager(paths, logger)
-        self.routing_manager = RoutingConfigManager(paths, logger)
-        
-        # 初始化高级配置文件
-        self._init_advanced_config()
+    # 各个配置管理器在首次使用时创建，只用到其中一个功能时不必初始化其余管理器
+    @cached_property
+    def proxy_manager(self) -> ProxyConfigManager:
+        """代理端口配置管理器"""
+        return ProxyConfigManager(self.paths, self.logger)
+    
+    @cached_property
+    def dns_manager(self) -> DNSConfigManager:
+        """DNS配置管理器"""
+        return DNSConfigManager(self.paths, self.logger)
+    
+    @cached_property
+    def tun_manager(self) -> TUNConfigManager:
+        """TUN模式配置管理器"""
+        return TUNConfigManager(self.paths, self.logger)
+    
+    @cached_property
+    def clash_manager(self) -> ClashConfigManager:
+        """Clash API配置管理器"""
+        return ClashConfigManager(self.paths, self.logger)
+    
+    @cached_property
+    def system_proxy_manager(self) -> SystemProxyManager:
+        """系统代理配置管理器"""
+        return SystemProxyManager(self.paths, self.logger)
+    
+    @cached_property
+    def routing_manager(self) -> RoutingConfigManager:
+        """路由规则配置管理器"""
+        return RoutingConfigManager(self.paths, self.logger)
     
     def _init_advanced_config(self):
-        """初始化高级配置文件"""
-        if not self.advanced_config_file.exists():
-            default_config = {
-                "version": "2.0",
-                "description": "SingTool高级配置文件 - 模块化设计",
-                "modules": {
-                    "proxy_ports": "代理端口配置",
-                    "dns": "DNS和FakeIP配置",
-                    "clash_api": "Clash API配置",
-                    "system_proxy": "系统代理配置",
-                    "routing": "路由规则配置"
-                },
-                "last_updated": None
-            }
-            
-            self.advanced_config_file.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.advanced_config_file, 'w', encoding='utf-8') as f:
-                json.dump(default_config, f, indent=2, ensure_ascii=False)
+        """写入默认高级配置文件"""
+        self.save_advanced_json(copy.deepcopy(_DEFAULT_ADVANCED_CONFIG))
     
-    def load_advanced_config(self) -> Dict[str, Any]:
-        """加载高级配置"""
-        try:
-            with open(self.advanced_config_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
+    def _get_config(self) -> Dict[str, Any]:
+        """返回共享缓存中的高级配置 (非副本)，文件不存在或损坏时先写入默认配置"""
+        config = self.load_advanced_json()
+        if not config or not isinstance(config, dict):
             self._init_advanced_config()
-            return self.load_advanced_config()
+            config = self.load_advanced_json()
+        return config
+    
+    def load_advanced_config(self) -> Dict[str, Any]:
+        """加载高级配置 (返回副本，修改后需调用 save_advanced_config)"""
+        return copy.deepcopy(self._get_config())
     
     def save_advanced_config(self, config: Dict[str, Any]):
         """保存高级配置"""
-        import datetime
-        config["last_updated"] = datetime.datetime.now().isoformat()
-        
-        with open(self.advanced_config_file, 'w', encoding='utf-8') as f:
-            json.dump(config, f, indent=2, ensure_ascii=False)
+        config = copy.deepcopy(config)
+        config["last_updated"] = datetime.now().isoformat(timespec="seconds")
+        self.save_advanced_json(config)
+    
+    def _commit(self, sections: Dict[str, Any]):
+        """更新高级配置中的若干配置段并写回文件"""
+        config = dict(self._get_config())
+        config.update(sections)
+        self.save_advanced_config(config)
     
     # === 代理端口配置 ===
     def configure_proxy_ports(self):
@@ -134,7 +163,7 @@ class AdvancedConfigManager:
     def configure_media_routing_rules(self):
         """配置媒体分流规则"""
         print()
-        print(f"{Colors.CYAN}🎬 媒体分流管理{Colors.NC}")
+        print(_HDR_MEDIA)
         print("管理流媒体、音乐、社交媒体等媒体服务的分流规则")
         print()
         print("此功能已集成到路由规则管理中，请使用「配置分流规则」功能。")
@@ -143,7 +172,7 @@ class AdvancedConfigManager:
     def configure_application_routing_rules(self):
         """配置程序分流规则"""
         print()
-        print(f"{Colors.CYAN}💻 程序分流管理{Colors.NC}")
+        print(_HDR_APP)
         print("管理开发工具、办公软件、游戏平台等应用程序的分流规则")
         print()
         print("此功能已集成到路由规则管理中，请使用「配置分流规则」功能。")
@@ -179,7 +208,7 @@ class AdvancedConfigManager:
     def show_config_overview(self):
         """显示配置概览"""
         print()
-        print(f"{Colors.CYAN}📊 配置概览{Colors.NC}")
+        print(_HDR_OVERVIEW)
         print("=" * 60)
         
         status = self.get_config_status()
@@ -215,7 +244,7 @@ class AdvancedConfigManager:
     # === 兼容性方法 ===
     def update_proxy_ports(self, proxy_config: Dict[str, Any]):
         """更新代理端口配置（兼容性方法）"""
-        self.proxy_manager.save_proxy_config(proxy_config)
+        self._commit({"proxy_ports": proxy_config})
     
     def load_system_proxy_config(self) -> Dict[str, Any]:
         """加载系统代理配置（兼容性方法）"""
@@ -241,7 +270,7 @@ class AdvancedConfigManager:
         
         export_data = {
             "version": "2.0",
-            "export_time": __import__('datetime').datetime.now().isoformat(),
+            "export_time": datetime.now().isoformat(timespec="seconds"),
             "proxy_ports": self.proxy_manager.load_proxy_config(),
             "clash_api": self.clash_manager.load_clash_config(),
             "system_proxy": self.system_proxy_manager.load_system_proxy_config(),
@@ -249,8 +278,7 @@ class AdvancedConfigManager:
         }
         
         try:
-            with open(export_file, 'w', encoding='utf-8') as f:
-                json.dump(export_data, f, indent=2, ensure_ascii=False)
+            write_json_file(Path(export_file), export_data)
             self.logger.info(f"✓ 配置已导出到: {export_file}")
         except Exception as e:
             self.logger.error(f"导出配置失败: {e}")
@@ -258,21 +286,14 @@ class AdvancedConfigManager:
     def import_config(self, import_file: str):
         """导入配置"""
         try:
-            with open(import_file, 'r', encoding='utf-8') as f:
-                import_data = json.load(f)
+            import_data = json_loads(Path(import_file).read_bytes())
             
-            # 导入各个模块的配置
-            if "proxy_ports" in import_data:
-                self.proxy_manager.save_proxy_config(import_data["proxy_ports"])
-            
-            if "clash_api" in import_data:
-                self.clash_manager.save_clash_config(import_data["clash_api"])
-            
-            if "system_proxy" in import_data:
-                self.system_proxy_manager.save_system_proxy_config(import_data["system_proxy"])
-            
-            if "routing" in import_data:
-                self.routing_manager.save_routing_config(import_data["routing"])
+            # 导入各个模块的配置，统一写入一次
+            self._commit({
+                module: import_data[module]
+                for module in ("proxy_ports", "clash_api", "system_proxy", "routing")
+                if module in import_data
+            })
             
             self.logger.info(f"✓ 配置已从 {import_file} 导入")
         except Exception as e:
@@ -283,21 +304,19 @@ class AdvancedConfigManager:
         """重置配置"""
         if module == "proxy_ports":
             # 重置代理端口配置
-            self.proxy_manager.save_proxy_config({
+            self._commit({"proxy_ports": {
                 "mixed_port": 7890,
                 "http_port": 7891, 
                 "socks_port": 7892,
                 "enabled": ["mixed"]
-            })
+            }})
             self.logger.info("✓ 代理端口配置已重置")
             
         elif module == "all":
             # 重置所有配置
             confirm = input(f"{Colors.RED}确定要重置所有高级配置吗? (输入 'yes' 确认): {Colors.NC}")
             if confirm == 'yes':
-                # 删除配置文件，重新初始化
-                if self.advanced_config_file.exists():
-                    self.advanced_config_file.unlink()
+                # 用默认配置覆盖配置文件
                 self._init_advanced_config()
                 self.logger.info("✓ 所有高级配置已重置")
             else:
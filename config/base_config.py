@@ -6,12 +6,23 @@
 Base Configuration Manager
 """
 
-import json
+import copy
+import os
+from contextlib import contextmanager
 from pathlib import Path
 from typing import Dict, Any
-from utils import Colors, Logger
+from utils import Colors, Logger, json_loads, json_dumps, read_json_file, atomic_write_bytes, intern_strings
 from paths import PathManager
 
+# advanced.json 解析缓存: 文件路径 -> ((mtime_ns, size), 配置)，各配置管理器共享
+_advanced_cache: Dict[Path, tuple] = {}
+
+# config.json 解析缓存: 文件路径 -> ((mtime_ns, size), 配置)
+_sing_box_cache: Dict[Path, tuple] = {}
+
+# 延迟写入期间尚未落盘的 advanced.json: 文件路径 -> 配置
+_pending_writes: Dict[Path, Dict[str, Any]] = {}
+_defer_depth = 0
 
 class BaseConfigManager:
     """基础配置管理类，提供通用的配置管理功能"""
@@ -20,25 +31,129 @@ class BaseConfigManager:
         self.paths = paths
         self.logger = logger
         self.config_file = self.paths.config_dir / "config.json"
+        self.advanced_config_file = self.paths.config_dir / "advanced.json"
+    
+    def load_advanced_json(self) -> Dict[str, Any]:
+        """加载 advanced.json，文件未修改时直接返回缓存的解析结果
+        
+        返回的字典在各管理器之间共享，需要修改时请先复制
+        """
+        path = self.advanced_config_file
+        pending = _pending_writes.get(path)
+        if pending is not None:
+            return pending
+        
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            stat = None
+        
+        # 文件不存在时同样缓存一个空配置，依赖对象标识的缓存才能命中
+        key = (stat.st_mtime_ns, stat.st_size) if stat is not None else None
+        cached = _advanced_cache.get(path)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        
+        if key is None:
+            config = {}
+            _advanced_cache[path] = (key, config)
+            return config
+        
+        try:
+            config = json_loads(path.read_bytes())
+        except ValueError:
+            return {}
+        
+        intern_strings(config)
+        _advanced_cache[path] = (key, config)
+        return config
+    
+    def save_advanced_section(self, section: str, value: Any):
+        """更新 advanced.json 中的一个配置段并写回文件"""
+        current = self.load_advanced_json()
+        # 内容未变化时 (如只查看未修改) 跳过写入
+        if section in current and current[section] == value:
+            return
+        
+        # 复制一份保存，调用方之后的修改不会影响缓存
+        config = dict(current)
+        config[section] = copy.deepcopy(value)
+        self.save_advanced_json(config)
+    
+    def save_advanced_json(self, config: Dict[str, Any]):
+        """写入整个 advanced.json，延迟写入期间只记录待写入的配置
+        
+        保存后 config 由缓存持有，调用方不应再修改
+        """
+        path = self.advanced_config_file
+        if _defer_depth:
+            _pending_writes[path] = config
+            return
+        
+        self._write_advanced_json(path, config)
+    
+    def _write_advanced_json(self, path: Path, config: Dict[str, Any]):
+        """写入 advanced.json 并用内存中的配置更新缓存"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_bytes(path, json_dumps(config))
+        
+        stat = os.stat(path)
+        _advanced_cache[path] = ((stat.st_mtime_ns, stat.st_size), config)
+    
+    @contextmanager
+    def deferred_advanced_writes(self):
+        """合并 with 块内对 advanced.json 的多次保存，退出时只写入一次
+        
+        写入失败时异常从 with 语句抛出，由调用方提示用户
+        """
+        global _defer_depth
+        _defer_depth += 1
+        try:
+            yield
+        finally:
+            _defer_depth -= 1
+            if not _defer_depth:
+                while _pending_writes:
+                    path, config = _pending_writes.popitem()
+                    self._write_advanced_json(path, config)
     
     def load_sing_box_config(self) -> Dict[str, Any]:
-        """加载 sing-box 配置文件"""
-        if not self.config_file.exists():
+        """加载 sing-box 配置文件，文件未修改时直接返回缓存的解析结果
+        
+        返回的字典在各管理器之间共享，需要修改时请先复制
+        """
+        path = self.config_file
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
             return {}
         
+        key = (stat.st_mtime_ns, stat.st_size)
+        cached = _sing_box_cache.get(path)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        
         try:
-            with open(self.config_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError) as e:
+            config = read_json_file(path)
+        except (FileNotFoundError, ValueError) as e:
             self.logger.error(f"读取 sing-box 配置失败: {e}")
             return {}
+        
+        _sing_box_cache[path] = (key, config)
+        return config
     
     def save_sing_box_config(self, config: Dict[str, Any]):
-        """保存 sing-box 配置文件"""
+        """保存 sing-box 配置文件，并用写入的配置更新缓存
+        
+        保存后 config 由缓存持有，调用方不应再修改
+        """
+        path = self.config_file
         try:
-            self.config_file.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=2, ensure_ascii=False)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            atomic_write_bytes(path, json_dumps(config))
+            
+            stat = os.stat(path)
+            _sing_box_cache[path] = ((stat.st_mtime_ns, stat.st_size), config)
         except Exception as e:
             self.logger.error(f"保存 sing-box 配置失败: {e}")
             raise
@@ -6,12 +6,65 @@ DNS和FakeIP配置管理模块
 DNS and FakeIP Configuration Manager
 """
 
-import json
+import copy
 from typing import Dict, Any
-from utils import Colors, Logger
+from utils import Colors, Logger, render_lines
 from paths import PathManager
 from .base_config import BaseConfigManager
 
+# 菜单标题
+_HDR_DNS = f"{Colors.CYAN}🌐 DNS & FakeIP 配置{Colors.NC}"
+_HDR_CURRENT = f"{Colors.YELLOW}当前DNS配置:{Colors.NC}"
+
+# DNS规则可选的Clash模式
+_DNS_CLASH_MODES = frozenset(('direct', 'global'))
+
+# 未配置DNS时使用的默认配置 (共享对象，调用方需要修改时请先复制)
+_DEFAULT_DNS_CONFIG = {
+    "servers": [
+        {"tag": "cloudflare", "address": "https://1.1.1.1/dns-query"},
+        {"tag": "local", "address": "223.5.5.5"}
+    ],
+    "rules": [
+        {"domain_suffix": [".cn", ".中国"], "server": "local"},
+        {"clash_mode": "direct", "server": "local"},
+        {"clash_mode": "global", "server": "cloudflare"}
+    ],
+    "final": "cloudflare"
+}
+
+_MENU_DNS = (
+    "配置选项:",
+    "1. 配置DNS服务器",
+    "2. 启用/禁用 FakeIP",
+    "3. 设置FakeIP范围",
+    "4. 配置DNS规则",
+    "5. 保存并返回",
+    ""
+)
+
+_MENU_DNS_SERVERS = (
+    "",
+    "1. 添加DNS服务器",
+    "2. 删除DNS服务器",
+    "3. 重置为默认服务器",
+    "4. 返回上级"
+)
+
+_MENU_DNS_RULES = (
+    "",
+    "1. 添加DNS规则",
+    "2. 删除DNS规则",
+    "3. 重置为默认规则",
+    "4. 返回上级"
+)
+
+_MENU_DNS_RULE_TYPES = (
+    "规则类型:",
+    "1. 域名后缀",
+    "2. Clash模式"
+)
+
 
 class DNSConfigManager(BaseConfigManager):
     """DNS和FakeIP配置管理器"""
@@ -21,13 +74,10 @@ class DNSConfigManager(BaseConfigManager):
     
     def configure_dns_fakeip(self):
         """配置DNS和FakeIP - 直接修改sing-box配置"""
-        print()
-        print(f"{Colors.CYAN}🌐 DNS & FakeIP 配置{Colors.NC}")
-        print("配置DNS服务器和FakeIP功能，优化域名解析")
-        print()
+        render_lines(["", _HDR_DNS, "配置DNS服务器和FakeIP功能，优化域名解析", ""])
         
-        # 读取当前sing-box配置
-        config = self.load_sing_box_config()
+        # 读取当前sing-box配置 (复制一份，未保存的修改不影响缓存)
+        config = copy.deepcopy(self.load_sing_box_config())
         if not config:
             self.logger.error("未找到 sing-box 配置文件")
             return
@@ -35,46 +85,43 @@ class DNSConfigManager(BaseConfigManager):
         dns_config = config.get("dns", {})
         fakeip_config = dns_config.get("fakeip", {})
         
-        print(f"{Colors.YELLOW}当前DNS配置:{Colors.NC}")
+        lines = [_HDR_CURRENT]
         
-        # 显示DNS服务器
+        # 显示DNS服务器 (只显示前3个)
         servers = dns_config.get("servers", [])
-        print(f"  DNS服务器数量: {len(servers)}")
-        for server in servers[:3]:  # 只显示前3个
-            tag = server.get("tag", "unknown")
-            address = server.get("address", "unknown")
-            print(f"    {tag}: {address}")
+        lines.append(f"  DNS服务器数量: {len(servers)}")
+        lines.extend(
+            f"    {server.get('tag', 'unknown')}: {server.get('address', 'unknown')}"
+            for server in servers[:3]
+        )
         if len(servers) > 3:
-            print(f"    ... 还有 {len(servers) - 3} 个服务器")
+            lines.append(f"    ... 还有 {len(servers) - 3} 个服务器")
         
         # 显示FakeIP状态
         fakeip_enabled = fakeip_config.get("enabled", False)
-        print(f"  FakeIP状态: {'启用' if fakeip_enabled else '禁用'}")
+        lines.append(f"  FakeIP状态: {'启用' if fakeip_enabled else '禁用'}")
         if fakeip_enabled:
-            print(f"  IPv4范围: {fakeip_config.get('inet4_range', '198.18.0.0/15')}")
-            print(f"  IPv6范围: {fakeip_config.get('inet6_range', 'fc00::/18')}")
+            lines.append(f"  IPv4范围: {fakeip_config.get('inet4_range', '198.18.0.0/15')}")
+            lines.append(f"  IPv6范围: {fakeip_config.get('inet6_range', 'fc00::/18')}")
         
-        print()
+        lines.append("")
+        render_lines(lines)
+        
+        handlers = {
+            "1": self._configure_dns_servers,
+            "2": self._toggle_fakeip,
+            "3": self._configure_fakeip_range,
+            "4": self._configure_dns_rules
+        }
         
         while True:
-            print("配置选项:")
-            print("1. 配置DNS服务器")
-            print("2. 启用/禁用 FakeIP")
-            print("3. 设置FakeIP范围")
-            print("4. 配置DNS规则")
-            print("5. 保存并返回")
-            print()
+            render_lines(_MENU_DNS)
             
             choice = input("请选择 [1-5]: ").strip()
             
-            if choice == "1":
-                self._configure_dns_servers(config)
-            elif choice == "2":
-                self._toggle_fakeip(config)
-            elif choice == "3":
-                self._configure_fakeip_range(config)
-            elif choice == "4":
-                self._configure_dns_rules(config)
+            handler = handlers.get(choice)
+            if handler is not None:
+                handler(config)
             elif choice == "5":
                 self.save_config_and_restart(config, "DNS配置已更新")
                 return
@@ -86,18 +133,13 @@ class DNSConfigManager(BaseConfigManager):
         dns_config = config.setdefault("dns", {})
         servers = dns_config.setdefault("servers", [])
         
-        print()
-        print("当前DNS服务器:")
-        for i, server in enumerate(servers, 1):
-            tag = server.get("tag", f"server{i}")
-            address = server.get("address", "unknown")
-            print(f"  {i}. {tag}: {address}")
-        
-        print()
-        print("1. 添加DNS服务器")
-        print("2. 删除DNS服务器")
-        print("3. 重置为默认服务器")
-        print("4. 返回上级")
+        lines = ["", "当前DNS服务器:"]
+        lines.extend(
+            f"  {i}. {server.get('tag', f'server{i}')}: {server.get('address', 'unknown')}"
+            for i, server in enumerate(servers, 1)
+        )
+        lines.extend(_MENU_DNS_SERVERS)
+        render_lines(lines)
         
         sub_choice = input("请选择 [1-4]: ").strip()
         
@@ -154,10 +196,7 @@ class DNSConfigManager(BaseConfigManager):
         current_v4 = fakeip_config.get("inet4_range", "198.18.0.0/15")
         current_v6 = fakeip_config.get("inet6_range", "fc00::/18")
         
-        print()
-        print(f"当前IPv4范围: {current_v4}")
-        print(f"当前IPv6范围: {current_v6}")
-        print()
+        render_lines(["", f"当前IPv4范围: {current_v4}", f"当前IPv6范围: {current_v6}", ""])
         
         new_v4 = input(f"设置IPv4范围 (当前: {current_v4}, 留空不修改): ").strip()
         if new_v4:
@@ -174,31 +213,25 @@ class DNSConfigManager(BaseConfigManager):
         dns_config = config.setdefault("dns", {})
         rules = dns_config.setdefault("rules", [])
         
-        print()
-        print("当前DNS规则:")
+        lines = ["", "当前DNS规则:"]
         for i, rule in enumerate(rules, 1):
-            server = rule.get("server", "unknown")
             conditions = []
-            if "domain_suffix" in rule:
-                conditions.append(f"域名后缀: {rule['domain_suffix'][:2]}...")
-            if "clash_mode" in rule:
-                conditions.append(f"模式: {rule['clash_mode']}")
-            print(f"  {i}. 服务器: {server}, 条件: {', '.join(conditions)}")
-        
-        print()
-        print("1. 添加DNS规则")
-        print("2. 删除DNS规则")
-        print("3. 重置为默认规则")
-        print("4. 返回上级")
+            domain_suffix = rule.get("domain_suffix")
+            if domain_suffix is not None:
+                conditions.append(f"域名后缀: {domain_suffix[:2]}...")
+            clash_mode = rule.get("clash_mode")
+            if clash_mode is not None:
+                conditions.append(f"模式: {clash_mode}")
+            lines.append(f"  {i}. 服务器: {rule.get('server', 'unknown')}, 条件: {', '.join(conditions)}")
+        lines.extend(_MENU_DNS_RULES)
+        render_lines(lines)
         
         sub_choice = input("请选择 [1-4]: ").strip()
         
         if sub_choice == "1":
             server = input("DNS服务器标签: ").strip()
             if server:
-                print("规则类型:")
-                print("1. 域名后缀")
-                print("2. Clash模式")
+                render_lines(_MENU_DNS_RULE_TYPES)
                 rule_type = input("选择规则类型 [1-2]: ").strip()
                 
                 if rule_type == "1":
@@ -209,7 +242,7 @@ class DNSConfigManager(BaseConfigManager):
                         self.logger.info(f"✓ 已添加域名后缀规则")
                 elif rule_type == "2":
                     mode = input("Clash模式 (direct/global): ").strip()
-                    if mode in ["direct", "global"]:
+                    if mode in _DNS_CLASH_MODES:
                         rules.append({"clash_mode": mode, "server": server})
                         self.logger.info(f"✓ 已添加Clash模式规则")
         
@@ -239,17 +272,6 @@ class DNSConfigManager(BaseConfigManager):
         dns_config = config.get("dns", {})
         
         if not dns_config:
-            return {
-                "servers": [
-                    {"tag": "cloudflare", "address": "https://1.1.1.1/dns-query"},
-                    {"tag": "local", "address": "223.5.5.5"}
-                ],
-                "rules": [
-                    {"domain_suffix": [".cn", ".中国"], "server": "local"},
-                    {"clash_mode": "direct", "server": "local"},
-                    {"clash_mode": "global", "server": "cloudflare"}
-                ],
-                "final": "cloudflare"
-            }
+            return _DEFAULT_DNS_CONFIG
         
         return dns_config 
\ No newline at end of file
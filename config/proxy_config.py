@@ -6,133 +6,109 @@
 Proxy Port Configuration Manager
 """
 
-import json
-from typing import Dict, Any, List
-from utils import Colors, Logger
+import copy
+from typing import Dict, Any, List, Optional
+from utils import Colors, Logger, render_lines
 from paths import PathManager
 from .base_config import BaseConfigManager
 
+# 菜单标题
+_HDR_PROXY = f"{Colors.CYAN}🔗 代理端口配置{Colors.NC}"
+_HDR_CURRENT = f"{Colors.YELLOW}当前配置:{Colors.NC}"
+
+# 可启用的代理端口类型
+_VALID_PROXY_TYPES = frozenset(('mixed', 'http', 'socks'))
+
+# 入站配置模板: (端口类型, 端口配置项, 默认端口, 模板)，生成时只填入监听端口
+_INBOUND_TEMPLATES = tuple(
+    (port_type, f"{port_type}_port", default_port, {
+        "type": port_type,
+        "tag": f"{port_type}-in",
+        "listen": "127.0.0.1",
+        "listen_port": default_port,
+        "sniff": True,
+        "sniff_override_destination": True
+    })
+    for port_type, default_port in (("mixed", 7890), ("http", 7891), ("socks", 7892))
+)
+
+# 端口设置菜单: 选项 -> (端口配置项, 名称, 默认端口)
+_PORT_SETTINGS = {
+    "1": ("mixed_port", "混合", 7890),
+    "2": ("http_port", "HTTP", 7891),
+    "3": ("socks_port", "SOCKS", 7892)
+}
+
+_MENU_PROXY = (
+    "配置选项:",
+    "1. 设置混合端口",
+    "2. 设置HTTP端口",
+    "3. 设置SOCKS端口",
+    "4. 启用/禁用端口类型",
+    "5. 保存并返回",
+    ""
+)
+
+
+def _parse_port(text: str) -> Optional[int]:
+    """解析端口号，不是 1-65535 之间的整数时返回 None"""
+    if not text.isdecimal():
+        return None
+    port = int(text)
+    return port if 1 <= port <= 65535 else None
+
 
 class ProxyConfigManager(BaseConfigManager):
     """代理端口配置管理器"""
     
     def __init__(self, paths: PathManager, logger: Logger):
         super().__init__(paths, logger)
-        self.advanced_config_file = self.paths.config_dir / "advanced.json"
     
     def load_proxy_config(self) -> Dict[str, Any]:
         """加载代理端口配置"""
-        if not self.advanced_config_file.exists():
-            return {
-                "mixed_port": 7890,
-                "http_port": 7891,
-                "socks_port": 7892,
-                "enabled": ["mixed"]
-            }
-        
-        try:
-            with open(self.advanced_config_file, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-                return config.get("proxy_ports", {
-                    "mixed_port": 7890,
-                    "http_port": 7891,
-                    "socks_port": 7892,
-                    "enabled": ["mixed"]
-                })
-        except (FileNotFoundError, json.JSONDecodeError):
-            return {
-                "mixed_port": 7890,
-                "http_port": 7891,
-                "socks_port": 7892,
-                "enabled": ["mixed"]
-            }
+        config = self.load_advanced_json()
+        return config.get("proxy_ports", {
+            "mixed_port": 7890,
+            "http_port": 7891,
+            "socks_port": 7892,
+            "enabled": ["mixed"]
+        })
     
     def save_proxy_config(self, proxy_config: Dict[str, Any]):
         """保存代理端口配置"""
-        if self.advanced_config_file.exists():
-            try:
-                with open(self.advanced_config_file, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
-            except (FileNotFoundError, json.JSONDecodeError):
-                config = {}
-        else:
-            config = {}
-        
-        config["proxy_ports"] = proxy_config
-        
         try:
-            self.advanced_config_file.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.advanced_config_file, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=2, ensure_ascii=False)
+            self.save_advanced_section("proxy_ports", proxy_config)
         except Exception as e:
             self.logger.error(f"保存代理端口配置失败: {e}")
     
     def configure_proxy_ports(self):
         """配置代理端口"""
-        print()
-        print(f"{Colors.CYAN}🔗 代理端口配置{Colors.NC}")
-        print("管理混合端口、HTTP端口、SOCKS端口等代理入站设置")
-        print()
+        # 菜单内会直接修改配置，使用副本以免影响共享缓存
+        proxy_config = copy.deepcopy(self.load_proxy_config())
         
-        proxy_config = self.load_proxy_config()
-        
-        print(f"{Colors.YELLOW}当前配置:{Colors.NC}")
-        print(f"  混合端口: {proxy_config.get('mixed_port', 7890)}")
-        print(f"  HTTP端口: {proxy_config.get('http_port', 7891)}")
-        print(f"  SOCKS端口: {proxy_config.get('socks_port', 7892)}")
-        print(f"  启用端口: {', '.join(proxy_config.get('enabled', ['mixed']))}")
-        print()
+        render_lines([
+            "",
+            _HDR_PROXY,
+            "管理混合端口、HTTP端口、SOCKS端口等代理入站设置",
+            "",
+            _HDR_CURRENT,
+            f"  混合端口: {proxy_config.get('mixed_port', 7890)}",
+            f"  HTTP端口: {proxy_config.get('http_port', 7891)}",
+            f"  SOCKS端口: {proxy_config.get('socks_port', 7892)}",
+            f"  启用端口: {', '.join(proxy_config.get('enabled', ['mixed']))}",
+            ""
+        ])
         
         while True:
-            print("配置选项:")
-            print("1. 设置混合端口")
-            print("2. 设置HTTP端口")
-            print("3. 设置SOCKS端口")
-            print("4. 启用/禁用端口类型")
-            print("5. 保存并返回")
-            print()
+            render_lines(_MENU_PROXY)
             
             choice = input("请选择 [1-5]: ").strip()
             
-            if choice == "1":
-                try:
-                    port = int(input(f"设置混合端口 (当前: {proxy_config.get('mixed_port', 7890)}): ").strip())
-                    proxy_config['mixed_port'] = port
-                    self.logger.info(f"✓ 混合端口设置为: {port}")
-                except ValueError:
-                    self.logger.error("端口必须是数字")
-                    
-            elif choice == "2":
-                try:
-                    port = int(input(f"设置HTTP端口 (当前: {proxy_config.get('http_port', 7891)}): ").strip())
-                    proxy_config['http_port'] = port
-                    self.logger.info(f"✓ HTTP端口设置为: {port}")
-                except ValueError:
-                    self.logger.error("端口必须是数字")
-                    
-            elif choice == "3":
-                try:
-                    port = int(input(f"设置SOCKS端口 (当前: {proxy_config.get('socks_port', 7892)}): ").strip())
-                    proxy_config['socks_port'] = port
-                    self.logger.info(f"✓ SOCKS端口设置为: {port}")
-                except ValueError:
-                    self.logger.error("端口必须是数字")
-                    
+            port_setting = _PORT_SETTINGS.get(choice)
+            if port_setting is not None:
+                self._set_port(proxy_config, *port_setting)
             elif choice == "4":
-                print("可用类型: mixed, http, socks")
-                enabled_input = input("输入要启用的端口类型 (用逗号分隔): ").strip()
-                valid_types = []
-                for port_type in enabled_input.split(','):
-                    port_type = port_type.strip()
-                    if port_type in ['mixed', 'http', 'socks']:
-                        valid_types.append(port_type)
-                
-                if valid_types:
-                    proxy_config['enabled'] = valid_types
-                    self.logger.info(f"✓ 已启用端口类型: {', '.join(valid_types)}")
-                else:
-                    self.logger.error("无效的端口类型")
-                    
+                self._set_enabled_types(proxy_config)
             elif choice == "5":
                 self.save_proxy_config(proxy_config)
                 self.logger.info("✓ 代理端口配置已保存")
@@ -140,41 +116,38 @@ class ProxyConfigManager(BaseConfigManager):
             else:
                 self.logger.error("无效选项")
     
+    def _set_port(self, proxy_config: Dict[str, Any], key: str, label: str, default: int):
+        """设置单个端口"""
+        port = _parse_port(input(f"设置{label}端口 (当前: {proxy_config.get(key, default)}): ").strip())
+        if port is None:
+            self.logger.error("端口必须是 1-65535 之间的数字")
+            return
+        
+        proxy_config[key] = port
+        self.logger.info(f"✓ {label}端口设置为: {port}")
+    
+    def _set_enabled_types(self, proxy_config: Dict[str, Any]):
+        """启用/禁用端口类型"""
+        print("可用类型: mixed, http, socks")
+        enabled_input = input("输入要启用的端口类型 (用逗号分隔): ").strip()
+        # 过滤无效类型并去重，保持输入顺序
+        valid_types = list(dict.fromkeys(
+            t for t in (p.strip() for p in enabled_input.split(',')) if t in _VALID_PROXY_TYPES
+        ))
+        
+        if valid_types:
+            proxy_config['enabled'] = valid_types
+            self.logger.info(f"✓ 已启用端口类型: {', '.join(valid_types)}")
+        else:
+            self.logger.error("无效的端口类型")
+    
     def generate_inbounds_config(self) -> List[Dict[str, Any]]:
         """根据代理配置生成入站配置"""
         proxy_config = self.load_proxy_config()
-        enabled_ports = proxy_config.get("enabled", ["mixed"])
-        
-        inbounds = []
-        
-        if "mixed" in enabled_ports:
-            inbounds.append({
-                "type": "mixed",
-                "tag": "mixed-in",
-                "listen": "127.0.0.1",
-                "listen_port": proxy_config.get("mixed_port", 7890),
-                "sniff": True,
-                "sniff_override_destination": True
-            })
-        
-        if "http" in enabled_ports:
-            inbounds.append({
-                "type": "http",
-                "tag": "http-in", 
-                "listen": "127.0.0.1",
-                "listen_port": proxy_config.get("http_port", 7891),
-                "sniff": True,
-                "sniff_override_destination": True
-            })
-        
-        if "socks" in enabled_ports:
-            inbounds.append({
-                "type": "socks",
-                "tag": "socks-in",
-                "listen": "127.0.0.1", 
-                "listen_port": proxy_config.get("socks_port", 7892),
-                "sniff": True,
-                "sniff_override_destination": True
-            })
+        enabled_ports = frozenset(proxy_config.get("enabled", ("mixed",)))
         
-        return inbounds 
\ No newline at end of file
+        return [
+            dict(template, listen_port=proxy_config.get(port_key, default_port))
+            for port_type, port_key, default_port, template in _INBOUND_TEMPLATES
+            if port_type in enabled_ports
+        ]
\ No newline at end of file
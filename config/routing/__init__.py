@@ -10,10 +10,12 @@ from .rule_manager import RuleManager
 from .media_rules import MediaRulesManager
 from .app_rules import AppRulesManager
 from .rule_import_export import RuleImportExportManager
+from .rule_matcher import RuleMatcher
 
 __all__ = [
     'RuleManager',
     'MediaRulesManager', 
     'AppRulesManager',
-    'RuleImportExportManager'
+    'RuleImportExportManager',
+    'RuleMatcher'
 ] 
\ No newline at end of file
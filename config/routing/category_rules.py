@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+分类分流规则管理器基类
+Category Routing Rules Manager Base
+"""
+
+from typing import Dict, Any, List, Tuple
+from utils import Colors, Logger, render_lines
+from .rule_manager import set_rule_enabled, rule_set_detail_lines
+
+# 自定义分类规则类型选项: 编号 -> (字段, 名称)，与 _DOMAIN_EXAMPLES 顺序一致
+_CUSTOM_RULE_TYPES = {
+    "1": ("domain_suffix", "域名后缀"),
+    "2": ("domain_keyword", "域名关键词"),
+    "3": ("domain", "完整域名")
+}
+
+# 规则组状态标签
+_STATUS_ENABLED = f"{Colors.GREEN}启用{Colors.NC}"
+_STATUS_DISABLED = f"{Colors.RED}禁用{Colors.NC}"
+_STATUS_UNCONFIGURED = f"{Colors.YELLOW}未配置{Colors.NC}"
+
+# 自定义分类规则出站选项
+_OUTBOUND_MAP = {"1": "🚀 节点选择", "2": "direct", "3": "block"}
+
+_MENU_OUTBOUND = (
+    "",
+    "选择出站方式:",
+    "1. 🚀 节点选择 - 走代理",
+    "2. direct - 直连",
+    "3. block - 拦截"
+)
+
+
+class CategoryRulesManager:
+    """分类分流规则管理器基类，媒体分流和程序分流共用"""
+    
+    # 以下由子类定义
+    _RULE_SETS: Tuple[Tuple[str, str], ...] = ()    # ((规则集ID, 显示名称), ...)
+    _CATEGORY = ""                                  # 分类名称，如 "媒体"
+    _TITLE = ""
+    _DESCRIPTION = ""
+    _MENU: Tuple[str, ...] = ()
+    _CUSTOM_DESCRIPTION = ""
+    _NAME_PROMPT = ""
+    _NAME_REQUIRED = ""
+    _DOMAIN_EXAMPLES = ("", "", "")                 # (域名后缀, 域名关键词, 完整域名) 示例
+    
+    def __init__(self, logger: Logger):
+        self.logger = logger
+    
+    def _configure_category_routing(self, routing_config: Dict[str, Any], save_callback):
+        """分类分流规则管理菜单"""
+        render_lines(["", f"{Colors.CYAN}{self._TITLE}{Colors.NC}", self._DESCRIPTION, ""])
+        
+        rule_sets = routing_config.get("rule_sets", {})
+        handlers = {
+            "1": self._enable_all_rules,
+            "2": self._disable_all_rules,
+            "3": self._manage_single_category_rule,
+            "4": self._view_category_rule_details,
+            "5": self._add_custom_category_rule,
+            "6": self._set_category_rule_priorities
+        }
+        
+        while True:
+            # 状态与菜单一次写出，避免逐行刷新
+            render_lines(self._rules_status_lines(rule_sets) + list(self._MENU))
+            
+            choice = input("请选择 [1-7]: ").strip()
+            
+            handler = handlers.get(choice)
+            if handler is not None:
+                handler(routing_config)
+            elif choice == "7":
+                save_callback(routing_config)
+                self.logger.info(f"✓ {self._CATEGORY}分流规则配置已保存")
+                break
+            else:
+                self.logger.error("无效选项")
+            
+            print()
+    
+    def _rules_status_lines(self, rule_sets: Dict[str, Any]) -> List[str]:
+        """生成本分类规则状态的显示行"""
+        lines = [f"{Colors.YELLOW}当前{self._CATEGORY}分流规则状态:{Colors.NC}", ""]
+        for rule_id, rule_name in self._RULE_SETS:
+            rule_set = rule_sets.get(rule_id)
+            if rule_set is not None:
+                status = _STATUS_ENABLED if rule_set.get("enabled", False) else _STATUS_DISABLED
+                rules_count = len(rule_set.get("rules", []))
+                priority = rule_set.get("priority", 0)
+                lines.append(f"  {rule_name}: {status} ({rules_count} 条规则, 优先级: {priority})")
+            else:
+                lines.append(f"  {rule_name}: {_STATUS_UNCONFIGURED}")
+        lines.append("")
+        return lines
+    
+    def _enable_all_rules(self, routing_config: Dict[str, Any]):
+        """一键启用本分类所有分流"""
+        self._bulk_toggle(routing_config, True)
+        self.logger.info(f"✓ 已启用所有{self._CATEGORY}分流规则")
+    
+    def _disable_all_rules(self, routing_config: Dict[str, Any]):
+        """一键禁用本分类所有分流"""
+        self._bulk_toggle(routing_config, False)
+        self.logger.info(f"✓ 已禁用所有{self._CATEGORY}分流规则")
+    
+    def _bulk_toggle(self, routing_config: Dict[str, Any], enable: bool):
+        """批量启用/禁用本分类下已配置的规则组"""
+        rule_sets = routing_config.get("rule_sets", {})
+        rule_ids = [rule_id for rule_id, _ in self._RULE_SETS if rule_id in rule_sets]
+        
+        for rule_id in rule_ids:
+            rule_sets[rule_id]["enabled"] = enable
+        
+        if enable:
+            enabled_rules = routing_config.setdefault("enabled_rules", [])
+            enabled_set = set(enabled_rules)
+            enabled_rules.extend(rule_id for rule_id in rule_ids if rule_id not in enabled_set)
+        elif rule_ids:
+            # 一次遍历移除，保持其余规则顺序
+            disabled = set(rule_ids)
+            enabled_rules = routing_config.get("enabled_rules", [])
+            enabled_rules[:] = [rule_id for rule_id in enabled_rules if rule_id not in disabled]
+    
+    def _manage_single_category_rule(self, routing_config: Dict[str, Any]):
+        """单独管理规则组"""
+        rule_sets = routing_config.get("rule_sets", {})
+        
+        lines = ["", f"选择要管理的{self._CATEGORY}规则组:"]
+        rule_list = self._RULE_SETS
+        for i, (rule_id, rule_name) in enumerate(rule_list, 1):
+            rule_set = rule_sets.get(rule_id)
+            status = "启用" if rule_set is not None and rule_set.get("enabled", False) else "禁用"
+            lines.append(f"{i}. {rule_name} ({status})")
+        render_lines(lines)
+        
+        try:
+            choice_idx = int(input("请选择规则组编号: ")) - 1
+            if 0 <= choice_idx < len(rule_list):
+                rule_id, rule_name = rule_list[choice_idx]
+                rule_set = rule_sets.get(rule_id)
+                if rule_set is not None:
+                    self._manage_single_rule(rule_id, rule_set, routing_config)
+                else:
+                    self.logger.error("该规则组未配置")
+            else:
+                self.logger.error("无效选择")
+        except ValueError:
+            self.logger.error("请输入有效数字")
+    
+    def _view_category_rule_details(self, routing_config: Dict[str, Any]):
+        """查看规则详情"""
+        rule_sets = routing_config.get("rule_sets", {})
+        
+        lines = ["", f"选择要查看的{self._CATEGORY}规则组:"]
+        rule_list = self._RULE_SETS
+        lines.extend(f"{i}. {rule_name}" for i, (_, rule_name) in enumerate(rule_list, 1))
+        render_lines(lines)
+        
+        try:
+            choice_idx = int(input("请选择规则组编号: ")) - 1
+            if 0 <= choice_idx < len(rule_list):
+                rule_id, rule_name = rule_list[choice_idx]
+                rule_set = rule_sets.get(rule_id)
+                if rule_set is not None:
+                    self._view_rule_set_details(rule_id, rule_set)
+                else:
+                    self.logger.error("该规则组未配置")
+            else:
+                self.logger.error("无效选择")
+        except ValueError:
+            self.logger.error("请输入有效数字")
+    
+    def _add_custom_category_rule(self, routing_config: Dict[str, Any]):
+        """添加自定义分类规则"""
+        render_lines(["", f"{Colors.CYAN}添加自定义{self._CATEGORY}规则{Colors.NC}", self._CUSTOM_DESCRIPTION, ""])
+        
+        service_name = input(self._NAME_PROMPT).strip()
+        if not service_name:
+            self.logger.error(self._NAME_REQUIRED)
+            return
+        
+        lines = ["", "选择规则类型:"]
+        for (choice, (_, label)), example in zip(_CUSTOM_RULE_TYPES.items(), self._DOMAIN_EXAMPLES):
+            lines.append(f"{choice}. {label} (如: {example})")
+        render_lines(lines)
+        
+        selected = _CUSTOM_RULE_TYPES.get(input("请选择 [1-3]: ").strip())
+        
+        if selected is None:
+            self.logger.error("无效选项")
+            return
+        rule_type = selected[0]
+        
+        domains = input("输入域名 (多个用逗号或分号分隔): ").strip()
+        # 一次切分并去除空项和重复项
+        domain_list = list(dict.fromkeys(
+            d for d in (p.strip() for p in domains.replace(";", ",").split(",")) if d
+        ))
+        if not domain_list:
+            self.logger.error("域名不能为空")
+            return
+        
+        # 选择出站
+        render_lines(_MENU_OUTBOUND)
+        
+        outbound_choice = input("请选择 [1-3]: ").strip()
+        outbound = _OUTBOUND_MAP.get(outbound_choice, "🚀 节点选择")
+        
+        # 添加到custom规则集
+        rule_sets = routing_config.setdefault("rule_sets", {})
+        custom_rules = rule_sets.setdefault("custom", {
+            "name": "自定义规则",
+            "enabled": True,
+            "priority": 400,
+            "rules": []
+        })
+        
+        rules = custom_rules["rules"]
+        
+        # 最后一条规则的类型和出站相同时直接并入，不改变其他规则的匹配顺序
+        last_rule = rules[-1] if rules else None
+        if last_rule is not None and last_rule.keys() == {"outbound", rule_type} and last_rule["outbound"] == outbound:
+            existing = set(last_rule[rule_type])
+            new_domains = [d for d in domain_list if d not in existing]
+            if not new_domains:
+                self.logger.warn("相同的自定义规则已存在")
+                return
+            last_rule[rule_type].extend(new_domains)
+        else:
+            rule = {"outbound": outbound, rule_type: domain_list}
+            if rule in rules:
+                self.logger.warn("相同的自定义规则已存在")
+                return
+            rules.append(rule)
+        
+        self.logger.info(f"✓ 已添加 {service_name} 的自定义{self._CATEGORY}规则")
+    
+    def _set_category_rule_priorities(self, routing_config: Dict[str, Any]):
+        """设置分类规则优先级"""
+        rule_sets = routing_config.get("rule_sets", {})
+        configured = [
+            (rule_name, rule_sets[rule_id]) for rule_id, rule_name in self._RULE_SETS
+            if rule_id in rule_sets
+        ]
+        
+        lines = [
+            "",
+            f"{Colors.CYAN}设置{self._CATEGORY}规则优先级{Colors.NC}",
+            "数字越小优先级越高，建议范围: 1-500",
+            ""
+        ]
+        for i, (rule_name, rule_set) in enumerate(configured, 1):
+            lines.append(f"{i}. {rule_name} (当前: {rule_set.get('priority', 100)})")
+        lines.append("")
+        render_lines(lines)
+        
+        # 一次输入设置多个规则组，留空则逐个询问
+        batch = input("批量设置 (如: 1=50,3=120，直接回车逐个设置): ").strip()
+        if batch:
+            self._apply_priority_batch(configured, batch)
+            return
+        
+        for rule_name, rule_set in configured:
+            current_priority = rule_set.get("priority", 100)
+            try:
+                new_priority = input(f"{rule_name} (当前: {current_priority}): ").strip()
+                if new_priority:
+                    rule_set["priority"] = int(new_priority)
+                    self.logger.info(f"✓ {rule_name} 优先级设置为: {new_priority}")
+            except ValueError:
+                self.logger.error(f"跳过 {rule_name}: 输入无效")
+    
+    def _apply_priority_batch(self, configured: List[Tuple[str, Dict[str, Any]]], batch: str):
+        """应用 "编号=优先级" 形式的批量优先级设置"""
+        for item in batch.replace("，", ",").split(","):
+            item = item.strip()
+            if not item:
+                continue
+            index, _, priority = item.partition("=")
+            try:
+                index, priority = int(index), int(priority)
+            except ValueError:
+                index = 0
+            if not 1 <= index <= len(configured):
+                self.logger.error(f"跳过 {item}: 输入无效")
+                continue
+            rule_name, rule_set = configured[index - 1]
+            rule_set["priority"] = priority
+            self.logger.info(f"✓ {rule_name} 优先级设置为: {rule_set['priority']}")
+    
+    def _manage_single_rule(self, rule_id: str, rule_set: Dict[str, Any], routing_config: Dict[str, Any]):
+        """管理单个规则组"""
+        render_lines([
+            "",
+            f"{Colors.CYAN}管理规则组: {rule_set.get('name', rule_id)}{Colors.NC}",
+            "",
+            "1. 启用/禁用规则组",
+            "2. 修改优先级",
+            "3. 查看规则详情",
+            "4. 返回"
+        ])
+        
+        choice = input("请选择 [1-4]: ").strip()
+        
+        if choice == "1":
+            current_status = rule_set.get("enabled", False)
+            rule_set["enabled"] = not current_status
+            new_status = "启用" if not current_status else "禁用"
+            
+            # 更新enabled_rules列表
+            set_rule_enabled(routing_config, rule_id, not current_status)
+            
+            self.logger.info(f"✓ 规则组已{new_status}")
+            
+        elif choice == "2":
+            try:
+                new_priority = int(input(f"当前优先级: {rule_set.get('priority', 100)}, 输入新优先级: "))
+                rule_set["priority"] = new_priority
+                self.logger.info(f"✓ 优先级已设置为: {new_priority}")
+            except ValueError:
+                self.logger.error("请输入有效数字")
+                
+        elif choice == "3":
+            self._view_rule_set_details(rule_id, rule_set)
+            
+        elif choice == "4":
+            return
+        else:
+            self.logger.error("无效选项")
+    
+    def _view_rule_set_details(self, rule_id: str, rule_set: Dict[str, Any]):
+        """查看规则集详情"""
+        render_lines(rule_set_detail_lines(rule_id, rule_set))
\ No newline at end of file
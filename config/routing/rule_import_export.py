@@ -6,10 +6,44 @@
 Rule Import Export Manager
 """
 
-import json
-from typing import Dict, Any
+import os
+from datetime import datetime
+from typing import Dict, Any, List, Optional
 from pathlib import Path
-from utils import Logger
+from utils import Logger, render_lines, read_json_file, write_json_file
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    import fastjsonschema
+except ImportError:
+    fastjsonschema = None
+
+# 规则文件的结构: 每个规则集需有 rules 列表，每条规则需有 outbound
+_RULE_FILE_SCHEMA = {
+    "type": "object",
+    "required": ["rule_sets"],
+    "properties": {
+        "rule_sets": {
+            "type": "object",
+            "additionalProperties": {
+                "type": "object",
+                "required": ["rules"],
+                "properties": {
+                    "rules": {
+                        "type": "array",
+                        "items": {"type": "object", "required": ["outbound"]}
+                    }
+                }
+            }
+        }
+    }
+}
+
+_validate_rule_file = fastjsonschema.compile(_RULE_FILE_SCHEMA) if fastjsonschema is not None else None
 
 
 class RuleImportExportManager:
@@ -18,13 +52,15 @@ class RuleImportExportManager:
     def __init__(self, config_dir: Path, logger: Logger):
         self.config_dir = config_dir
         self.logger = logger
+        
+        # 备份文件列表缓存: (配置目录 mtime_ns, 按文件名排序的备份文件)
+        self._backup_cache = None
     
     def export_rules(self, routing_config: Dict[str, Any]):
         """导出规则"""
         export_file = self.config_dir / "routing_rules_export.json"
         try:
-            with open(export_file, 'w', encoding='utf-8') as f:
-                json.dump(routing_config, f, indent=2, ensure_ascii=False)
+            write_json_file(export_file, routing_config)
             self.logger.info(f"✓ 规则已导出到: {export_file}")
         except Exception as e:
             self.logger.error(f"导出失败: {e}")
@@ -33,19 +69,30 @@ class RuleImportExportManager:
         """导入规则"""
         import_file = input("请输入要导入的文件路径: ").strip()
         try:
-            with open(import_file, 'r', encoding='utf-8') as f:
-                imported_config = json.load(f)
+            imported_rule_sets = self._read_rule_sets(Path(import_file))
             
-            # 合并规则
-            if 'rule_sets' in imported_config:
-                routing_config.setdefault('rule_sets', {})
-                routing_config['rule_sets'].update(imported_config['rule_sets'])
+            # 合并规则 (导入的规则集来自刚解析的文件，不与其他对象共享，无需复制)
+            if imported_rule_sets is not None:
+                routing_config.setdefault('rule_sets', {}).update(imported_rule_sets)
                 self.logger.info("✓ 规则导入成功")
             else:
                 self.logger.error("导入文件格式不正确")
         except Exception as e:
             self.logger.error(f"导入失败: {e}")
     
+    def _read_rule_sets(self, import_file: Path) -> Optional[Dict[str, Any]]:
+        """读取导入文件中的 rule_sets，不存在时返回 None
+        
+        安装了 ijson 时流式解析，只构建 rule_sets，不必整体载入文件
+        """
+        if ijson is None:
+            imported_config = read_json_file(import_file)
+            return imported_config['rule_sets'] if 'rule_sets' in imported_config else None
+        
+        # 顶层存在 rule_sets 时恰好产出一个值 (包括空字典)，不存在时不产出
+        with open(import_file, 'rb') as f:
+            return next(ijson.items(f, 'rule_sets', use_float=True), None)
+    
     def export_rule_set(self, rule_id: str, rule_set: Dict[str, Any]):
         """导出单个规则集"""
         export_file = self.config_dir / f"rule_set_{rule_id}.json"
@@ -55,86 +102,83 @@ class RuleImportExportManager:
                     rule_id: rule_set
                 }
             }
-            with open(export_file, 'w', encoding='utf-8') as f:
-                json.dump(export_data, f, indent=2, ensure_ascii=False)
+            write_json_file(export_file, export_data)
             self.logger.info(f"✓ 规则集 {rule_id} 已导出到: {export_file}")
         except Exception as e:
             self.logger.error(f"导出规则集失败: {e}")
     
     def backup_rules(self, routing_config: Dict[str, Any]):
         """备份当前规则"""
-        from datetime import datetime
-        
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         backup_file = self.config_dir / f"routing_backup_{timestamp}.json"
         
         try:
-            with open(backup_file, 'w', encoding='utf-8') as f:
-                json.dump(routing_config, f, indent=2, ensure_ascii=False)
+            write_json_file(backup_file, routing_config)
+            self._backup_cache = None
             self.logger.info(f"✓ 规则已备份到: {backup_file}")
             return backup_file
         except Exception as e:
             self.logger.error(f"备份失败: {e}")
             return None
     
+    def _list_backups(self) -> List[Path]:
+        """列出备份文件，配置目录未变化时复用上次的扫描结果"""
+        try:
+            mtime = os.stat(self.config_dir).st_mtime_ns
+        except FileNotFoundError:
+            return []
+        
+        if self._backup_cache is None or self._backup_cache[0] != mtime:
+            # 文件名带时间戳，按名称排序即按时间排序
+            self._backup_cache = (mtime, sorted(self.config_dir.glob("routing_backup_*.json")))
+        return self._backup_cache[1]
+    
     def restore_from_backup(self, routing_config: Dict[str, Any]):
         """从备份恢复规则"""
-        backup_files = list(self.config_dir.glob("routing_backup_*.json"))
+        backup_files = self._list_backups()
         
         if not backup_files:
             self.logger.warn("未找到备份文件")
             return
         
-        print()
-        print("可用的备份文件:")
-        for i, backup_file in enumerate(backup_files, 1):
-            print(f"  {i}. {backup_file.name}")
+        lines = ["", "可用的备份文件:"]
+        lines.extend(f"  {i}. {backup_file.name}" for i, backup_file in enumerate(backup_files, 1))
+        render_lines(lines)
         
         try:
             choice = int(input("请选择备份文件编号: ").strip()) - 1
             if 0 <= choice < len(backup_files):
                 backup_file = backup_files[choice]
-                
-                with open(backup_file, 'r', encoding='utf-8') as f:
-                    backup_config = json.load(f)
+                backup_config = read_json_file(backup_file)
                 
                 routing_config.clear()
                 routing_config.update(backup_config)
                 self.logger.info(f"✓ 已从备份恢复: {backup_file.name}")
             else:
                 self.logger.error("无效选择")
-        except (ValueError, json.JSONDecodeError) as e:
+        except ValueError as e:
             self.logger.error(f"恢复失败: {e}")
     
     def validate_rule_format(self, rule_data: Dict[str, Any]) -> bool:
         """验证规则格式"""
-        if not isinstance(rule_data, dict):
-            return False
+        if _validate_rule_file is not None:
+            try:
+                _validate_rule_file(rule_data)
+            except fastjsonschema.JsonSchemaException:
+                return False
+            return True
         
-        if 'rule_sets' not in rule_data:
+        if not isinstance(rule_data, dict):
             return False
         
-        rule_sets = rule_data['rule_sets']
+        rule_sets = rule_data.get('rule_sets')
         if not isinstance(rule_sets, dict):
             return False
         
-        for rule_id, rule_set in rule_sets.items():
-            if not isinstance(rule_set, dict):
-                return False
-            
-            # 检查必要字段
-            if 'rules' not in rule_set:
-                return False
-            
-            if not isinstance(rule_set['rules'], list):
-                return False
-            
-            # 检查每个规则
-            for rule in rule_set['rules']:
-                if not isinstance(rule, dict):
-                    return False
-                
-                if 'outbound' not in rule:
-                    return False
-        
-        return True 
\ No newline at end of file
+        # 遇到第一个不合格的规则集或规则即返回
+        return all(
+            isinstance(rule_set, dict)
+            and isinstance(rule_set.get('rules'), list)
+            and all(isinstance(rule, dict) and 'outbound' in rule for rule in rule_set['rules'])
+            for rule_set in rule_sets.values()
+        )
\ No newline at end of file
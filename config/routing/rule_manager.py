@@ -6,8 +6,117 @@
 Rule Set Manager
 """
 
-from typing import Dict, Any, List
-from utils import Colors, Logger
+from itertools import islice
+from typing import Dict, Any, List, Optional
+from utils import Colors, Logger, render_lines
+
+# 自定义规则类型选项
+_RULE_TYPES = {
+    "1": "domain",
+    "2": "domain_suffix",
+    "3": "domain_keyword",
+    "4": "ip_cidr",
+    "5": "port"
+}
+
+# 规则详情中依次探测的条件类型
+_RULE_KEYS = tuple(_RULE_TYPES.values())
+
+# 自定义规则出站选项
+_OUTBOUND_MAP = {"1": "direct", "2": "🚀 节点选择", "3": "block"}
+
+_MENU_RULE_TYPES = (
+    "规则类型:",
+    "1. 域名规则 (domain)",
+    "2. 域名后缀 (domain_suffix)",
+    "3. 域名关键词 (domain_keyword)",
+    "4. IP/CIDR规则 (ip_cidr)",
+    "5. 端口规则 (port)",
+    ""
+)
+
+_MENU_OUTBOUND = (
+    "",
+    "出站选择:",
+    "1. direct - 直连",
+    "2. 🚀 节点选择 - 代理",
+    "3. block - 拦截"
+)
+
+_MENU_EDIT_RULE_SET = (
+    "",
+    "1. 启用/禁用规则组",
+    "2. 修改优先级",
+    "3. 查看详细规则",
+    "4. 返回上级"
+)
+
+# 规则预览中显示的条件类型
+_PREVIEW_LABELS = {
+    "domain_suffix": "域名后缀",
+    "domain_keyword": "域名关键词",
+    "ip_cidr": "IP段"
+}
+
+# 规则详情显示字段: (字段, 名称, 最多显示个数)
+_DETAIL_FIELDS = (
+    ("domain_suffix", "域名后缀", 5),
+    ("domain_keyword", "域名关键词", 5),
+    ("domain", "完整域名", 5),
+    ("ip_cidr", "IP段", 3)
+)
+
+# 确认输入
+_YES = frozenset(('y', 'yes'))
+
+
+def _priority_key(item):
+    """规则组排序键: (规则组ID, 优先级) -> 优先级"""
+    return item[1]
+
+
+def rule_set_detail_lines(rule_id: str, rule_set: Dict[str, Any]) -> List[str]:
+    """生成规则集详情的显示行"""
+    rules = rule_set.get("rules", [])
+    lines = [
+        "",
+        f"{Colors.CYAN}规则集详情: {rule_set.get('name', rule_id)}{Colors.NC}",
+        f"ID: {rule_id}",
+        f"启用状态: {'启用' if rule_set.get('enabled', False) else '禁用'}",
+        f"优先级: {rule_set.get('priority', 100)}",
+        f"规则数量: {len(rules)}",
+        ""
+    ]
+    
+    if not rules:
+        lines.append("该规则集为空")
+        return lines
+    
+    lines.append("规则详情:")
+    for i, rule in enumerate(rules, 1):
+        lines.append(f"  {i}. 出站: {rule.get('outbound', 'proxy')}")
+        for key, label, limit in _DETAIL_FIELDS:
+            values = rule.get(key)
+            if not values:
+                continue
+            count = len(values)
+            suffix = f" (共{count}个)" if count > limit else ""
+            lines.append(f"     {label}: {', '.join(islice(values, limit))}{suffix}")
+    return lines
+
+
+def set_rule_enabled(routing_config: Dict[str, Any], rule_id: str, enabled: bool):
+    """在 enabled_rules 中加入或移除规则组
+    
+    enabled_rules 保持为列表: 同优先级的规则组按其中的顺序匹配，且需要原样保存为JSON
+    """
+    enabled_rules = routing_config.setdefault("enabled_rules", [])
+    if enabled:
+        if rule_id not in enabled_rules:
+            enabled_rules.append(rule_id)
+    else:
+        # 一次遍历移除，重复出现的条目也一并清除
+        enabled_rules[:] = [enabled_id for enabled_id in enabled_rules if enabled_id != rule_id]
 
 
 class RuleManager:
@@ -15,24 +124,38 @@ class RuleManager:
     
     def __init__(self, logger: Logger):
         self.logger = logger
+        
+        # 按优先级排好的规则组ID，及计算时各规则组的 (ID, 优先级)
+        self._priority_order: List[str] = []
+        self._priority_signature: tuple = ()
+    
+    def _sorted_rule_ids(self, rule_sets: Dict[str, Any]) -> List[str]:
+        """按优先级排序的规则组ID，规则组及其优先级都未变化时直接复用上次的结果
+        
+        规则组可能在其他菜单中被直接修改，因此以 (ID, 优先级) 判断是否需要重新排序，
+        而不依赖各修改处主动标记
+        """
+        signature = tuple((rule_id, rule_set.get('priority', 999)) for rule_id, rule_set in rule_sets.items())
+        if signature != self._priority_signature:
+            self._priority_order = [rule_id for rule_id, _ in sorted(signature, key=_priority_key)]
+            self._priority_signature = signature
+        return self._priority_order
     
     def view_all_rule_sets(self, routing_config: Dict[str, Any]):
         """查看所有规则组"""
-        print()
-        print(f"{Colors.CYAN}📋 所有规则组{Colors.NC}")
-        print("=" * 80)
+        lines = ["", f"{Colors.CYAN}📋 所有规则组{Colors.NC}", "=" * 80]
         
         rule_sets = routing_config.get("rule_sets", {})
-        enabled_rules = routing_config.get("enabled_rules", [])
+        enabled_rules = set(routing_config.get("enabled_rules", []))
         
         if not rule_sets:
-            print("暂无规则组")
+            lines.append("暂无规则组")
+            render_lines(lines)
             return
         
         # 按优先级排序
-        sorted_rules = sorted(rule_sets.items(), key=lambda x: x[1].get('priority', 999))
-        
-        for rule_id, rule_set in sorted_rules:
+        for rule_id in self._sorted_rule_ids(rule_sets):
+            rule_set = rule_sets[rule_id]
             name = rule_set.get('name', rule_id)
             enabled = rule_set.get('enabled', True)
             priority = rule_set.get('priority', 999)
@@ -40,28 +163,29 @@ class RuleManager:
             is_active = rule_id in enabled_rules
             
             status = f"{Colors.GREEN}●{Colors.NC}" if (enabled and is_active) else f"{Colors.RED}○{Colors.NC}"
-            print(f"{status} {name} (优先级: {priority})")
-            print(f"    规则数量: {len(rules)} 条")
+            lines.append(f"{status} {name} (优先级: {priority})")
+            lines.append(f"    规则数量: {len(rules)} 条")
             
             if rules:
-                print("    规则预览:")
-                for i, rule in enumerate(rules[:3]):  # 只显示前3条
-                    rule_type = list(rule.keys())[0] if rule else "unknown"
+                lines.append("    规则预览:")
+                for i, rule in enumerate(islice(rules, 3)):  # 只显示前3条
+                    # 跳过 outbound 取第一个匹配条件
+                    rule_type = next((key for key in rule if key != 'outbound'), "unknown")
                     outbound = rule.get('outbound', 'unknown')
-                    if rule_type == 'domain_suffix':
-                        preview = f"域名后缀: {rule[rule_type][:2]}..."
-                    elif rule_type == 'domain_keyword':
-                        preview = f"域名关键词: {rule[rule_type][:2]}..."
-                    elif rule_type == 'ip_cidr':
-                        preview = f"IP段: {rule[rule_type][:2]}..."
+                    label = _PREVIEW_LABELS.get(rule_type)
+                    if label:
+                        values = ", ".join(islice(map(str, rule[rule_type]), 2))
+                        preview = f"{label}: {values}..."
                     else:
                         preview = f"{rule_type}: ..."
                     
-                    print(f"      {i+1}. {preview} → {outbound}")
+                    lines.append(f"      {i+1}. {preview} → {outbound}")
                 
                 if len(rules) > 3:
-                    print(f"      ... 还有 {len(rules) - 3} 条规则")
-            print()
+                    lines.append(f"      ... 还有 {len(rules) - 3} 条规则")
+            lines.append("")
+        
+        render_lines(lines)
     
     def edit_rule_set(self, routing_config: Dict[str, Any]):
         """编辑规则组"""
@@ -71,14 +195,14 @@ class RuleManager:
             self.logger.warn("暂无规则组可编辑")
             return
         
-        print()
-        print(f"{Colors.CYAN}选择要编辑的规则组:{Colors.NC}")
+        lines = ["", f"{Colors.CYAN}选择要编辑的规则组:{Colors.NC}"]
         rule_list = list(rule_sets.items())
         
         for i, (rule_id, rule_set) in enumerate(rule_list, 1):
             name = rule_set.get('name', rule_id)
             enabled = "✓" if rule_set.get('enabled', True) else "✗"
-            print(f"  {i}. {enabled} {name}")
+            lines.append(f"  {i}. {enabled} {name}")
+        render_lines(lines)
         
         try:
             choice = int(input("请选择规则组编号: ").strip()) - 1
@@ -92,65 +216,76 @@ class RuleManager:
     
     def edit_single_rule_set(self, rule_id: str, rule_set: Dict[str, Any], routing_config: Dict[str, Any]):
         """编辑单个规则组"""
-        print()
-        print(f"{Colors.CYAN}编辑规则组: {rule_set.get('name', rule_id)}{Colors.NC}")
-        print()
-        
-        print("1. 启用/禁用规则组")
-        print("2. 修改优先级")
-        print("3. 查看详细规则")
-        print("4. 返回上级")
+        render_lines(["", f"{Colors.CYAN}编辑规则组: {rule_set.get('name', rule_id)}{Colors.NC}", *_MENU_EDIT_RULE_SET])
         
         choice = input("请选择 [1-4]: ").strip()
         
-        if choice == "1":
-            current = rule_set.get('enabled', True)
-            rule_set['enabled'] = not current
-            status = '启用' if not current else '禁用'
-            self.logger.info(f"✓ 规则组已{status}")
-            
-        elif choice == "2":
-            try:
-                current_priority = rule_set.get('priority', 999)
-                new_priority = int(input(f"设置优先级 (当前: {current_priority}, 数字越小优先级越高): ").strip())
-                rule_set['priority'] = new_priority
-                self.logger.info(f"✓ 优先级设置为: {new_priority}")
-            except ValueError:
-                self.logger.error("优先级必须是数字")
-                
-        elif choice == "3":
-            rules = rule_set.get('rules', [])
-            print()
-            print(f"规则详情 (共 {len(rules)} 条):")
-            for i, rule in enumerate(rules, 1):
-                self.print_rule_details(i, rule)
-                
-        elif choice == "4":
-            return
-        else:
+        handlers = {
+            "1": self._toggle_rule_set,
+            "2": self._set_rule_set_priority,
+            "3": self._show_rule_set_rules
+        }
+        
+        handler = handlers.get(choice)
+        if handler is not None:
+            handler(rule_set)
+        elif choice != "4":
             self.logger.error("无效选项")
     
-    def print_rule_details(self, index: int, rule: Dict[str, Any]):
-        """打印规则详情"""
+    def _toggle_rule_set(self, rule_set: Dict[str, Any]):
+        """启用/禁用规则组"""
+        current = rule_set.get('enabled', True)
+        rule_set['enabled'] = not current
+        status = '启用' if not current else '禁用'
+        self.logger.info(f"✓ 规则组已{status}")
+    
+    def _set_rule_set_priority(self, rule_set: Dict[str, Any]):
+        """修改规则组优先级"""
+        try:
+            current_priority = rule_set.get('priority', 999)
+            new_priority = int(input(f"设置优先级 (当前: {current_priority}, 数字越小优先级越高): ").strip())
+            rule_set['priority'] = new_priority
+            self.logger.info(f"✓ 优先级设置为: {new_priority}")
+        except ValueError:
+            self.logger.error("优先级必须是数字")
+    
+    def _show_rule_set_rules(self, rule_set: Dict[str, Any]):
+        """查看规则组的详细规则"""
+        rules = rule_set.get('rules', [])
+        lines = ["", f"规则详情 (共 {len(rules)} 条):"]
+        for i, rule in enumerate(rules, 1):
+            line = self.rule_detail_line(i, rule)
+            if line is not None:
+                lines.append(line)
+        render_lines(lines)
+    
+    def rule_detail_line(self, index: int, rule: Dict[str, Any]) -> Optional[str]:
+        """生成单条规则的显示行，规则没有任何条件时返回 None"""
         outbound = rule.get('outbound', 'unknown')
         
-        for rule_type, rule_value in rule.items():
-            if rule_type != 'outbound':
-                if isinstance(rule_value, list):
-                    value_str = ', '.join(str(v) for v in rule_value[:3])
-                    if len(rule_value) > 3:
-                        value_str += f" ... (共{len(rule_value)}个)"
-                else:
-                    value_str = str(rule_value)
-                    
-                print(f"  {index}. {rule_type}: {value_str} → {outbound}")
+        for rule_type in _RULE_KEYS:
+            rule_value = rule.get(rule_type)
+            if rule_value is not None:
                 break
+        else:
+            # 其他条件类型，取第一个非出站字段
+            rule_type = next((key for key in rule if key != 'outbound'), None)
+            if rule_type is None:
+                return None
+            rule_value = rule[rule_type]
+        
+        if isinstance(rule_value, list):
+            value_str = ', '.join(str(v) for v in rule_value[:3])
+            if len(rule_value) > 3:
+                value_str += f" ... (共{len(rule_value)}个)"
+        else:
+            value_str = str(rule_value)
+        
+        return f"  {index}. {rule_type}: {value_str} → {outbound}"
     
     def add_custom_rule(self, routing_config: Dict[str, Any]):
         """添加自定义规则"""
-        print()
-        print(f"{Colors.CYAN}➕ 添加自定义规则{Colors.NC}")
-        print()
+        render_lines(["", f"{Colors.CYAN}➕ 添加自定义规则{Colors.NC}", ""])
         
         # 获取自定义规则组
         rule_sets = routing_config.setdefault("rule_sets", {})
@@ -161,25 +296,11 @@ class RuleManager:
             "rules": []
         })
         
-        print("规则类型:")
-        print("1. 域名规则 (domain)")
-        print("2. 域名后缀 (domain_suffix)")
-        print("3. 域名关键词 (domain_keyword)")
-        print("4. IP/CIDR规则 (ip_cidr)")
-        print("5. 端口规则 (port)")
-        print()
+        render_lines(_MENU_RULE_TYPES)
         
         rule_type_choice = input("请选择规则类型 [1-5]: ").strip()
         
-        rule_types = {
-            "1": "domain",
-            "2": "domain_suffix", 
-            "3": "domain_keyword",
-            "4": "ip_cidr",
-            "5": "port"
-        }
-        
-        rule_type = rule_types.get(rule_type_choice)
+        rule_type = _RULE_TYPES.get(rule_type_choice)
         if not rule_type:
             self.logger.error("无效的规则类型")
             return
@@ -187,14 +308,14 @@ class RuleManager:
         # 获取规则值
         if rule_type == "port":
             value_input = input("请输入端口 (例: 80 或 80,443): ").strip()
-            try:
-                if ',' in value_input:
-                    values = [int(p.strip()) for p in value_input.split(',')]
-                else:
-                    values = [int(value_input)]
-            except ValueError:
+            parts = [p.strip() for p in value_input.split(',')]
+            if not all(p.isdecimal() for p in parts):
                 self.logger.error("端口必须是数字")
                 return
+            values = [int(p) for p in parts]
+            if not all(0 < port <= 65535 for port in values):
+                self.logger.error("端口范围必须在 1-65535 之间")
+                return
         else:
             value_input = input(f"请输入{rule_type}值 (多个用逗号分隔): ").strip()
             values = [v.strip() for v in value_input.split(',') if v.strip()]
@@ -204,24 +325,20 @@ class RuleManager:
             return
         
         # 选择出站
-        print()
-        print("出站选择:")
-        print("1. direct - 直连")
-        print("2. 🚀 节点选择 - 代理")
-        print("3. block - 拦截")
+        render_lines(_MENU_OUTBOUND)
         
         outbound_choice = input("请选择出站 [1-3]: ").strip()
-        outbound_map = {"1": "direct", "2": "🚀 节点选择", "3": "block"}
-        outbound = outbound_map.get(outbound_choice, "🚀 节点选择")
+        outbound = _OUTBOUND_MAP.get(outbound_choice, "🚀 节点选择")
         
         # 创建规则
         new_rule = {rule_type: values, "outbound": outbound}
+        if new_rule in custom_rules["rules"]:
+            self.logger.warn("相同的自定义规则已存在")
+            return
         custom_rules["rules"].append(new_rule)
         
         # 确保自定义规则组在启用列表中
-        enabled_rules = routing_config.setdefault("enabled_rules", [])
-        if "custom" not in enabled_rules:
-            enabled_rules.append("custom")
+        set_rule_enabled(routing_config, "custom", True)
         
         self.logger.info(f"✓ 已添加自定义规则: {rule_type}={values} → {outbound}")
     
@@ -233,26 +350,24 @@ class RuleManager:
             self.logger.warn("暂无规则组可删除")
             return
         
-        print()
-        print("选择要删除的规则组:")
+        lines = ["", "选择要删除的规则组:"]
         rule_list = list(rule_sets.keys())
         
         for i, rule_id in enumerate(rule_list, 1):
             rule_set = rule_sets[rule_id]
             name = rule_set.get('name', rule_id)
-            print(f"  {i}. {name}")
+            lines.append(f"  {i}. {name}")
+        render_lines(lines)
         
         try:
             choice = int(input("请选择规则组编号: ").strip()) - 1
             if 0 <= choice < len(rule_list):
                 rule_id = rule_list[choice]
                 confirm = input(f"确定要删除规则组 '{rule_id}' 吗? (y/N): ").strip().lower()
-                if confirm in ['y', 'yes']:
+                if confirm in _YES:
                     del rule_sets[rule_id]
                     # 从启用列表中移除
-                    enabled_rules = routing_config.get("enabled_rules", [])
-                    if rule_id in enabled_rules:
-                        enabled_rules.remove(rule_id)
+                    set_rule_enabled(routing_config, rule_id, False)
                     self.logger.info(f"✓ 已删除规则组: {rule_id}")
             else:
                 self.logger.error("无效的编号")
@@ -262,63 +377,30 @@ class RuleManager:
     def manage_enabled_rules(self, routing_config: Dict[str, Any]):
         """管理启用的规则组"""
         rule_sets = routing_config.get("rule_sets", {})
-        enabled_rules = routing_config.setdefault("enabled_rules", [])
+        enabled_set = set(routing_config.get("enabled_rules", []))
         
-        print()
-        print("规则组启用状态:")
+        lines = ["", "规则组启用状态:"]
         
         for rule_id, rule_set in rule_sets.items():
             name = rule_set.get('name', rule_id)
-            is_enabled = rule_id in enabled_rules
+            is_enabled = rule_id in enabled_set
             status = "✓" if is_enabled else "✗"
-            print(f"  {status} {name}")
+            lines.append(f"  {status} {name}")
         
-        print()
+        lines.append("")
+        render_lines(lines)
         toggle_rule = input("请输入要切换状态的规则组ID: ").strip()
         
         if toggle_rule in rule_sets:
-            if toggle_rule in enabled_rules:
-                enabled_rules.remove(toggle_rule)
-                self.logger.info(f"✓ 已禁用规则组: {toggle_rule}")
-            else:
-                enabled_rules.append(toggle_rule)
-                self.logger.info(f"✓ 已启用规则组: {toggle_rule}")
+            enable = toggle_rule not in enabled_set
+            set_rule_enabled(routing_config, toggle_rule, enable)
+            self.logger.info(f"✓ 已{'启用' if enable else '禁用'}规则组: {toggle_rule}")
         else:
             self.logger.error("规则组不存在")
     
     def view_rule_set_details(self, rule_id: str, rule_set: Dict[str, Any]):
         """查看规则集详情"""
-        print()
-        print(f"{Colors.CYAN}规则集详情: {rule_set.get('name', rule_id)}{Colors.NC}")
-        print(f"ID: {rule_id}")
-        print(f"启用状态: {'启用' if rule_set.get('enabled', False) else '禁用'}")
-        print(f"优先级: {rule_set.get('priority', 100)}")
-        print(f"规则数量: {len(rule_set.get('rules', []))}")
-        print()
-        
-        rules = rule_set.get("rules", [])
-        if rules:
-            print("规则详情:")
-            for i, rule in enumerate(rules, 1):
-                print(f"  {i}. 出站: {rule.get('outbound', 'proxy')}")
-                if 'domain_suffix' in rule:
-                    domains = rule['domain_suffix'][:5]  # 只显示前5个
-                    suffix = f" (共{len(rule['domain_suffix'])}个)" if len(rule['domain_suffix']) > 5 else ""
-                    print(f"     域名后缀: {', '.join(domains)}{suffix}")
-                if 'domain_keyword' in rule:
-                    keywords = rule['domain_keyword'][:5]
-                    suffix = f" (共{len(rule['domain_keyword'])}个)" if len(rule['domain_keyword']) > 5 else ""
-                    print(f"     域名关键词: {', '.join(keywords)}{suffix}")
-                if 'domain' in rule:
-                    domains = rule['domain'][:5]
-                    suffix = f" (共{len(rule['domain'])}个)" if len(rule['domain']) > 5 else ""
-                    print(f"     完整域名: {', '.join(domains)}{suffix}")
-                if 'ip_cidr' in rule:
-                    cidrs = rule['ip_cidr'][:3]
-                    suffix = f" (共{len(rule['ip_cidr'])}个)" if len(rule['ip_cidr']) > 3 else ""
-                    print(f"     IP段: {', '.join(cidrs)}{suffix}")
-        else:
-            print("该规则集为空")
+        render_lines(rule_set_detail_lines(rule_id, rule_set))
 
     def reset_rules(self, routing_config: Dict[str, Any]):
         """重置规则为默认值"""
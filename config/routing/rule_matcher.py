@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+路由规则匹配器
+Routing Rule Matcher
+"""
+
+import ipaddress
+from typing import Dict, Any, Iterable, Optional
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# 字典树终止标记 (域名标签不会为空，也不会包含".")
+_SUFFIX_END = ""        # 匹配域名本身及其子域名
+_SUBDOMAIN_END = "."    # 仅匹配子域名，如 ".cn"
+
+# 仅由这些字段组成的规则可以只凭域名判断是否命中
+_DOMAIN_RULE_KEYS = frozenset(("domain", "domain_suffix", "domain_keyword", "ip_cidr", "outbound"))
+
+
+class RuleMatcher:
+    """路由规则匹配器 - 将启用的规则集编译为反向域名字典树和按前缀长度分组的IP段索引"""
+    
+    def __init__(self, ordered: Iterable[Dict[str, Any]]):
+        """ordered: 已筛选并按优先级排好序的规则集，与生成路由配置时的顺序一致"""
+        self._domains = {}
+        self._suffix_trie = {}
+        self._keywords = {}
+        self._cidrs = {}        # (IP版本, 前缀长度) -> {网络地址: 命中}
+        self._automaton = None
+        self._keyword_grams = {}    # 关键词前两个字符 -> [(关键词, 命中)]，无 ahocorasick 时使用
+        self._short_keywords = []   # 单字符关键词
+        self._compile(ordered)
+    
+    def _compile(self, ordered: Iterable[Dict[str, Any]]):
+        """依次编译规则，命中结果记录为 (规则顺序, 出站)"""
+        order = 0
+        for rule_set in ordered:
+            for rule in rule_set.get("rules", []):
+                if not _DOMAIN_RULE_KEYS.issuperset(rule):
+                    continue
+                
+                hit = (order, rule.get("outbound", "proxy"))
+                order += 1
+                
+                for domain in rule.get("domain", []):
+                    self._domains.setdefault(domain.lower(), hit)
+                for suffix in rule.get("domain_suffix", []):
+                    self._insert_suffix(suffix.lower(), hit)
+                for keyword in rule.get("domain_keyword", []):
+                    self._keywords.setdefault(keyword.lower(), hit)
+                for cidr in rule.get("ip_cidr", []):
+                    self._insert_cidr(cidr, hit)
+        
+        # 不足两个字符的关键词 (包括会匹配所有域名的空关键词) 两种方式都直接检查，
+        # ahocorasick 会忽略空关键词，不能交给自动机
+        long_keywords = []
+        for keyword, hit in self._keywords.items():
+            if len(keyword) < 2:
+                self._short_keywords.append((keyword, hit))
+            else:
+                long_keywords.append((keyword, hit))
+        
+        if not long_keywords:
+            return
+        
+        if ahocorasick is not None:
+            automaton = ahocorasick.Automaton()
+            for keyword, hit in long_keywords:
+                automaton.add_word(keyword, hit)
+            automaton.make_automaton()
+            self._automaton = automaton
+        else:
+            # 按前两个字符分桶，匹配时只检查域名中出现过的双字符对应的关键词
+            for keyword, hit in long_keywords:
+                self._keyword_grams.setdefault(keyword[:2], []).append((keyword, hit))
+    
+    def _insert_suffix(self, suffix: str, hit: tuple):
+        """将域名后缀按标签反序插入字典树"""
+        end = _SUBDOMAIN_END if suffix.startswith(".") else _SUFFIX_END
+        node = self._suffix_trie
+        for label in reversed(suffix.strip(".").split(".")):
+            node = node.setdefault(label, {})
+        node.setdefault(end, hit)
+    
+    def _insert_cidr(self, cidr: str, hit: tuple):
+        """按前缀长度登记IP段，无效的IP段直接忽略"""
+        try:
+            network = ipaddress.ip_network(cidr, strict=False)
+        except ValueError:
+            return
+        networks = self._cidrs.setdefault((network.version, network.prefixlen), {})
+        networks.setdefault(int(network.network_address), hit)
+    
+    def _match_ip(self, address) -> Optional[tuple]:
+        """对每个前缀长度做一次掩码查表"""
+        best = None
+        value = int(address)
+        width = address.max_prefixlen
+        for (version, prefixlen), networks in self._cidrs.items():
+            if version != address.version:
+                continue
+            shift = width - prefixlen
+            hit = networks.get(value >> shift << shift)
+            if hit is not None and (best is None or hit < best):
+                best = hit
+        return best
+    
+    def match(self, host: str) -> Optional[str]:
+        """返回域名或IP命中的出站，未命中返回 None"""
+        host = host.lower().rstrip(".")
+        
+        if self._cidrs and (host[-1:].isdigit() or ":" in host):
+            try:
+                address = ipaddress.ip_address(host.strip("[]"))
+            except ValueError:
+                pass
+            else:
+                best = self._match_ip(address)
+                return best[1] if best is not None else None
+        
+        best = self._domains.get(host)
+        
+        # 从顶级域名向内逐级匹配后缀
+        labels = host.split(".")
+        node = self._suffix_trie
+        for index in range(len(labels) - 1, -1, -1):
+            label = labels[index]
+            if not label:
+                break
+            node = node.get(label)
+            if node is None:
+                break
+            
+            hit = node.get(_SUFFIX_END)
+            if hit is not None and (best is None or hit < best):
+                best = hit
+            if index:
+                hit = node.get(_SUBDOMAIN_END)
+                if hit is not None and (best is None or hit < best):
+                    best = hit
+        
+        # 关键词匹配
+        if self._automaton is not None:
+            for _, hit in self._automaton.iter(host):
+                if best is None or hit < best:
+                    best = hit
+        elif self._keyword_grams:
+            grams = self._keyword_grams
+            for index in range(len(host) - 1):
+                candidates = grams.get(host[index:index + 2])
+                if candidates is None:
+                    continue
+                for keyword, hit in candidates:
+                    if (best is None or hit < best) and host.startswith(keyword, index):
+                        best = hit
+        for keyword, hit in self._short_keywords:
+            if keyword in host and (best is None or hit < best):
+                best = hit
+        
+        return best[1] if best is not None else None
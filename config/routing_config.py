@@ -6,12 +6,141 @@
 Routing Configuration Manager
 """
 
-import json
-from typing import Dict, Any, List
-from utils import Colors, Logger
+import copy
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+from utils import Colors, Logger, render_lines
 from paths import PathManager
 from .base_config import BaseConfigManager
-from .routing import RuleManager, MediaRulesManager, AppRulesManager, RuleImportExportManager
+from .routing import RuleManager, MediaRulesManager, AppRulesManager, RuleImportExportManager, RuleMatcher
+
+# 默认出站选项
+_FINAL_OUTBOUND_MAP = {"1": "proxy", "2": "direct", "3": "block"}
+
+# 以下缓存按模块保存，每次新建的管理器也能复用
+# 按优先级排好序的启用规则集名称: advanced.json 路径 -> (advanced.json 缓存对象, 规则集名称)
+_sorted_rule_names_cache: Dict[Path, tuple] = {}
+
+# 生成的路由配置: advanced.json 路径 -> (生成时的 advanced.json 缓存对象, 路由配置)
+_route_config_cache: Dict[Path, tuple] = {}
+
+_MENU_ROUTING = (
+    "选择分流规则操作:",
+    "1. 📋 查看所有规则集",
+    "2. 🔧 编辑规则集",
+    "3. ➕ 添加自定义规则",
+    "4. 🗑️  删除规则",
+    "5. 📤 导出规则",
+    "6. 📥 导入规则",
+    "7. 🔄 重置规则",
+    "8. ⚙️  高级设置",
+    "9. 🎬 媒体分流管理",
+    "10. 💻 程序分流管理",
+    "11. 💾 保存并返回",
+    ""
+)
+
+_HDR_ROUTING = (
+    "",
+    f"{Colors.CYAN}🔀 分流规则管理{Colors.NC}",
+    "管理路由规则，决定不同流量的处理方式",
+    ""
+)
+
+_MENU_ADVANCED_ROUTING = (
+    "",
+    "1. 设置默认出站",
+    "2. 规则组启用/禁用",
+    "3. 备份与恢复",
+    "4. 测试域名匹配",
+    "5. 返回上级"
+)
+
+_MENU_FINAL_OUTBOUND = (
+    "默认出站选项:",
+    "1. proxy - 走代理 (实际使用: 🚀 节点选择)",
+    "2. direct - 直连",
+    "3. block - 拦截"
+)
+
+_MENU_BACKUP_RESTORE = (
+    "",
+    "备份与恢复:",
+    "1. 备份当前规则",
+    "2. 从备份恢复",
+    "3. 返回"
+)
+
+
+def _reversed_labels(domain: str) -> tuple:
+    """域名按标签反序，如 www.example.com -> ("com", "example", "www")"""
+    return tuple(reversed(domain.lower().strip(".").split(".")))
+
+
+def _is_covered(labels: tuple, subdomain_only: bool, suffixes: Dict[tuple, bool]) -> bool:
+    """判断域名 (或后缀) 是否已被 suffixes 中更短或相同的后缀覆盖
+    
+    suffixes: 反序标签 -> 是否仅匹配子域名 (以"."开头的后缀)
+    """
+    for length in range(1, len(labels)):
+        if labels[:length] in suffixes:
+            return True
+    same = suffixes.get(labels)
+    return same is not None and (not same or subdomain_only)
+
+
+def _normalize_rule(rule: Dict[str, Any]) -> Dict[str, Any]:
+    """去除规则内重复的值，并删除已被同一规则中其他后缀覆盖的域名和后缀"""
+    normalized = {}
+    for key, value in rule.items():
+        if isinstance(value, list):
+            try:
+                value = list(dict.fromkeys(value))
+            except TypeError:
+                pass
+        normalized[key] = value
+    
+    suffix_list = normalized.get("domain_suffix")
+    if not suffix_list or not all(isinstance(suffix, str) for suffix in suffix_list):
+        return normalized
+    
+    # 按反序标签排序后，覆盖者总是先于被覆盖者出现
+    entries = sorted((_reversed_labels(suffix), suffix.startswith("."), suffix) for suffix in suffix_list)
+    kept = {}
+    dropped = set()
+    for labels, subdomain_only, suffix in entries:
+        if _is_covered(labels, subdomain_only, kept):
+            dropped.add(suffix)
+        else:
+            kept.setdefault(labels, subdomain_only)
+    if dropped:
+        normalized["domain_suffix"] = [suffix for suffix in suffix_list if suffix not in dropped]
+    
+    domains = normalized.get("domain")
+    if domains:
+        remaining = [
+            domain for domain in domains
+            if not (isinstance(domain, str) and _is_covered(_reversed_labels(domain), False, kept))
+        ]
+        if remaining:
+            normalized["domain"] = remaining
+        else:
+            del normalized["domain"]
+    
+    return normalized
+
+
+def _rule_key(rule: Dict[str, Any]) -> Optional[tuple]:
+    """规则的可哈希表示，用于去除重复规则；含不可哈希的值时返回 None"""
+    key = tuple(sorted(
+        (name, tuple(value) if isinstance(value, list) else value)
+        for name, value in rule.items()
+    ))
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
 
 
 class RoutingConfigManager(BaseConfigManager):
@@ -19,13 +148,16 @@ class RoutingConfigManager(BaseConfigManager):
     
     def __init__(self, paths: PathManager, logger: Logger):
         super().__init__(paths, logger)
-        self.advanced_config_file = self.paths.config_dir / "advanced.json"
         
         # 初始化子模块管理器
         self.rule_manager = RuleManager(logger)
         self.media_rules_manager = MediaRulesManager(logger)
         self.app_rules_manager = AppRulesManager(logger)
         self.import_export_manager = RuleImportExportManager(self.paths.config_dir, logger)
+        
+        # 规则匹配索引，路由配置重新加载后重建
+        self._matcher = None
+        self._matcher_source = None
     
     def load_routing_config(self) -> Dict[str, Any]:
         """加载路由配置"""
@@ -53,100 +185,123 @@ class RoutingConfigManager(BaseConfigManager):
             }
         }
         
-        if not self.advanced_config_file.exists():
+        routing = self.load_advanced_json().get("routing")
+        if routing is None:
             return default_config
         
-        try:
-            with open(self.advanced_config_file, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-                routing = config.get("routing", {})
-                # 合并默认配置
-                for key, value in default_config.items():
-                    if key not in routing:
-                        routing[key] = value
-                return routing
-        except (FileNotFoundError, json.JSONDecodeError):
-            return default_config
+        # 合并默认配置到新字典，不修改共享缓存中的路由配置
+        return dict(default_config, **routing)
     
     def save_routing_config(self, routing_config: Dict[str, Any]):
         """保存路由配置"""
-        if self.advanced_config_file.exists():
-            try:
-                with open(self.advanced_config_file, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
-            except (FileNotFoundError, json.JSONDecodeError):
-                config = {}
-        else:
-            config = {}
-        
-        config["routing"] = routing_config
-        
         try:
-            self.advanced_config_file.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.advanced_config_file, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=2, ensure_ascii=False)
+            self.save_advanced_section("routing", routing_config)
         except Exception as e:
             self.logger.error(f"保存路由配置失败: {e}")
     
+    def _cached_source(self, routing_config: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """routing_config 的规则集直接取自 advanced.json 缓存 (未经菜单复制修改) 时返回该缓存对象，否则返回 None"""
+        config = self.load_advanced_json()
+        cached_routing = config.get("routing", {})
+        if (routing_config.get("rule_sets") is cached_routing.get("rule_sets")
+                and routing_config.get("enabled_rules") is cached_routing.get("enabled_rules")):
+            return config
+        return None
+    
+    def match(self, host: str, routing_config: Dict[str, Any] = None) -> Optional[str]:
+        """根据已启用的路由规则匹配域名或IP对应的出站
+        
+        传入菜单中正在编辑的 routing_config 时按其当前内容匹配，否则按已保存的配置匹配
+        """
+        if routing_config is None:
+            routing_config = self.load_routing_config()
+        
+        source = self._cached_source(routing_config)
+        if source is not None and self._matcher is not None and self._matcher_source is source:
+            return self._matcher.match(host)
+        
+        rule_sets = routing_config.get("rule_sets", {})
+        # 与 generate_route_config 共用排好序的规则集顺序
+        matcher = RuleMatcher(
+            rule_sets[rule_name] for rule_name in self._get_sorted_rule_names(routing_config)
+        )
+        # 只缓存已保存配置的匹配器，编辑中的配置随时可能变化
+        if source is not None:
+            self._matcher = matcher
+            self._matcher_source = source
+        return matcher.match(host)
+    
+    def _get_sorted_rule_names(self, routing_config: Dict[str, Any]) -> List[str]:
+        """返回 routing_config 中按优先级排序的已启用规则集名称
+        
+        只有 routing_config 的规则集来自 advanced.json 缓存时才复用上次结果
+        """
+        source = self._cached_source(routing_config)
+        if source is not None:
+            cached = _sorted_rule_names_cache.get(self.advanced_config_file)
+            if cached is not None and cached[0] is source:
+                return cached[1]
+        
+        rule_sets = routing_config.get("rule_sets", {})
+        rule_names = [
+            rule_name for rule_name in routing_config.get("enabled_rules", [])
+            if rule_name in rule_sets and rule_sets[rule_name].get("enabled", True)
+        ]
+        # 稳定排序，同优先级保持 enabled_rules 中的顺序
+        rule_names.sort(key=lambda rule_name: rule_sets[rule_name].get("priority", 100))
+        
+        if source is not None:
+            _sorted_rule_names_cache[self.advanced_config_file] = (source, rule_names)
+        return rule_names
+    
     def configure_routing_rules(self):
         """配置分流规则管理"""
-        print()
-        print(f"{Colors.CYAN}🔀 分流规则管理{Colors.NC}")
-        print("管理路由规则，决定不同流量的处理方式")
-        print()
-        
-        routing_config = self.load_routing_config()
-        
-        while True:
-            print("选择分流规则操作:")
-            print("1. 📋 查看所有规则集")
-            print("2. 🔧 编辑规则集")
-            print("3. ➕ 添加自定义规则")
-            print("4. 🗑️  删除规则")
-            print("5. 📤 导出规则")
-            print("6. 📥 导入规则")
-            print("7. 🔄 重置规则")
-            print("8. ⚙️  高级设置")
-            print("9. 🎬 媒体分流管理")
-            print("10. 💻 程序分流管理")
-            print("11. 💾 保存并返回")
-            print()
-            
-            choice = input("请选择 [1-11]: ").strip()
-            
-            if choice == "1":
-                self.rule_manager.view_all_rule_sets(routing_config)
-            elif choice == "2":
-                self.rule_manager.edit_rule_set(routing_config)
-            elif choice == "3":
-                self.rule_manager.add_custom_rule(routing_config)
-            elif choice == "4":
-                self.rule_manager.delete_rule(routing_config)
-            elif choice == "5":
-                self.import_export_manager.export_rules(routing_config)
-            elif choice == "6":
-                self.import_export_manager.import_rules(routing_config)
-            elif choice == "7":
-                self.rule_manager.reset_rules(routing_config)
-            elif choice == "8":
-                self._advanced_routing_settings(routing_config)
-            elif choice == "9":
-                self.configure_media_routing_rules(routing_config)
-            elif choice == "10":
-                self.configure_application_routing_rules(routing_config)
-            elif choice == "11":
-                self.save_routing_config(routing_config)
-                self.logger.info("✓ 分流规则配置已保存")
-                break
-            else:
-                self.logger.error("无效选项")
-            
-            print()
+        render_lines(_HDR_ROUTING)
+        
+        # 菜单内会直接修改配置，使用副本以免影响共享缓存
+        routing_config = copy.deepcopy(self.load_routing_config())
+        
+        handlers = {
+            "1": self.rule_manager.view_all_rule_sets,
+            "2": self.rule_manager.edit_rule_set,
+            "3": self.rule_manager.add_custom_rule,
+            "4": self.rule_manager.delete_rule,
+            "5": self.import_export_manager.export_rules,
+            "6": self.import_export_manager.import_rules,
+            "7": self.rule_manager.reset_rules,
+            "8": self._advanced_routing_settings,
+            "9": self.configure_media_routing_rules,
+            "10": self.configure_application_routing_rules
+        }
+        
+        # 子菜单的保存与退出时的保存合并为一次写入，退出 with 块时才真正写入文件
+        try:
+            with self.deferred_advanced_writes():
+                while True:
+                    render_lines(_MENU_ROUTING)
+                    
+                    choice = input("请选择 [1-11]: ").strip()
+                    
+                    handler = handlers.get(choice)
+                    if handler is not None:
+                        handler(routing_config)
+                    elif choice == "11":
+                        self.save_routing_config(routing_config)
+                        break
+                    else:
+                        self.logger.error("无效选项")
+                    
+                    print()
+        except Exception as e:
+            self.logger.error(f"保存路由配置失败: {e}")
+            return
+        
+        self.logger.info("✓ 分流规则配置已保存")
     
     def configure_media_routing_rules(self, routing_config: Dict[str, Any] = None):
         """配置媒体分流规则管理"""
         if routing_config is None:
-            routing_config = self.load_routing_config()
+            routing_config = copy.deepcopy(self.load_routing_config())
         
         self.media_rules_manager.configure_media_routing_rules(
             routing_config, 
@@ -156,7 +311,7 @@ class RoutingConfigManager(BaseConfigManager):
     def configure_application_routing_rules(self, routing_config: Dict[str, Any] = None):
         """配置程序分流规则管理"""
         if routing_config is None:
-            routing_config = self.load_routing_config()
+            routing_config = copy.deepcopy(self.load_routing_config())
         
         self.app_rules_manager.configure_application_routing_rules(
             routing_config,
@@ -165,22 +320,18 @@ class RoutingConfigManager(BaseConfigManager):
     
     def _advanced_routing_settings(self, routing_config: Dict[str, Any]):
         """高级路由设置"""
-        print()
-        print(f"{Colors.CYAN}⚙️  高级路由设置{Colors.NC}")
-        print()
-        
         current_final = routing_config.get("final_outbound", "proxy")
         # 显示实际使用的outbound名称
         display_final = "🚀 节点选择" if current_final == "proxy" else current_final
-        print(f"当前默认出站: {current_final} (实际使用: {display_final})")
-        print()
-        
-        print("1. 设置默认出站")
-        print("2. 规则组启用/禁用")
-        print("3. 备份与恢复")
-        print("4. 返回上级")
+        render_lines([
+            "",
+            f"{Colors.CYAN}⚙️  高级路由设置{Colors.NC}",
+            "",
+            f"当前默认出站: {current_final} (实际使用: {display_final})",
+            *_MENU_ADVANCED_ROUTING
+        ])
         
-        choice = input("请选择 [1-4]: ").strip()
+        choice = input("请选择 [1-5]: ").strip()
         
         if choice == "1":
             self._set_final_outbound(routing_config)
@@ -189,20 +340,34 @@ class RoutingConfigManager(BaseConfigManager):
         elif choice == "3":
             self._backup_restore_menu(routing_config)
         elif choice == "4":
+            self._test_match(routing_config)
+        elif choice == "5":
             return
         else:
             self.logger.error("无效选项")
     
+    def _test_match(self, routing_config: Dict[str, Any]):
+        """输入域名或IP，按当前编辑中的规则显示命中的出站"""
+        host = input("请输入要测试的域名或IP: ").strip()
+        if not host:
+            return
+        
+        outbound = self.match(host, routing_config)
+        if outbound is None:
+            outbound = routing_config.get("final_outbound", "proxy")
+            note = " (未命中规则，使用默认出站)"
+        else:
+            note = ""
+        # 显示实际使用的outbound名称
+        display = "🚀 节点选择" if outbound == "proxy" else outbound
+        self.logger.info(f"{host} -> {display}{note}")
+    
     def _set_final_outbound(self, routing_config: Dict[str, Any]):
         """设置默认出站"""
-        print("默认出站选项:")
-        print("1. proxy - 走代理 (实际使用: 🚀 节点选择)")
-        print("2. direct - 直连")
-        print("3. block - 拦截")
+        render_lines(_MENU_FINAL_OUTBOUND)
         
         outbound_choice = input("请选择 [1-3]: ").strip()
-        outbound_map = {"1": "proxy", "2": "direct", "3": "block"}
-        new_outbound = outbound_map.get(outbound_choice)
+        new_outbound = _FINAL_OUTBOUND_MAP.get(outbound_choice)
         
         if new_outbound:
             routing_config["final_outbound"] = new_outbound
@@ -213,11 +378,7 @@ class RoutingConfigManager(BaseConfigManager):
     
     def _backup_restore_menu(self, routing_config: Dict[str, Any]):
         """备份与恢复菜单"""
-        print()
-        print("备份与恢复:")
-        print("1. 备份当前规则")
-        print("2. 从备份恢复")
-        print("3. 返回")
+        render_lines(_MENU_BACKUP_RESTORE)
         
         choice = input("请选择 [1-3]: ").strip()
         
@@ -231,44 +392,49 @@ class RoutingConfigManager(BaseConfigManager):
             self.logger.error("无效选项")
     
     def generate_route_config(self) -> Dict[str, Any]:
-        """生成路由配置"""
-        routing_config = self.load_routing_config()
+        """生成路由配置
         
+        配置未变化时返回上次生成的同一个字典，调用方需要修改时请先复制
+        """
+        config = self.load_advanced_json()
+        cached = _route_config_cache.get(self.advanced_config_file)
+        if cached is not None and cached[0] is config:
+            return cached[1]
+        
+        route_config = self._build_route_config(self.load_routing_config())
+        _route_config_cache[self.advanced_config_file] = (config, route_config)
+        return route_config
+    
+    def _build_route_config(self, routing_config: Dict[str, Any]) -> Dict[str, Any]:
+        """根据路由规则配置生成 sing-box 路由配置"""
         if not routing_config.get("enabled_rules"):
             return {}
         
         # 生成路由规则
         route_rules = []
-        enabled_rules = routing_config.get("enabled_rules", [])
         rule_sets = routing_config.get("rule_sets", {})
         
-        # 按优先级排序规则集
-        sorted_rules = []
-        for rule_name in enabled_rules:
-            if rule_name in rule_sets and rule_sets[rule_name].get("enabled", True):
-                rule_set = rule_sets[rule_name]
-                priority = rule_set.get("priority", 100)
-                sorted_rules.append((priority, rule_name, rule_set))
+        # 完全相同的规则只保留第一条，后面的永远不会被命中
+        seen = set()
         
-        sorted_rules.sort(key=lambda x: x[0])  # 按优先级排序
-        
-        # 生成规则
-        for priority, rule_name, rule_set in sorted_rules:
-            for rule in rule_set.get("rules", []):
-                route_rule = {}
-                
-                # 复制规则条件
-                for key, value in rule.items():
-                    if key != "outbound":
-                        route_rule[key] = value
+        # 按优先级顺序生成规则
+        for rule_name in self._get_sorted_rule_names(routing_config):
+            for rule in rule_sets[rule_name].get("rules", []):
+                # 复制规则条件，去除重复和被覆盖的域名
+                route_rule = _normalize_rule(rule)
                 
-                # 设置出站，转换proxy为实际的outbound名称
-                original_outbound = rule.get("outbound", "proxy")
+                # 设置出站 (放在条件之后)，转换proxy为实际的outbound名称
+                original_outbound = route_rule.pop("outbound", "proxy")
                 if original_outbound == "proxy":
                     route_rule["outbound"] = "🚀 节点选择"
                 else:
                     route_rule["outbound"] = original_outbound
-                    
+                
+                key = _rule_key(route_rule)
+                if key is not None:
+                    if key in seen:
+                        continue
+                    seen.add(key)
                 route_rules.append(route_rule)
         
         # 获取final outbound设置，确保使用正确的outbound名称
@@ -6,7 +6,7 @@
 System Proxy Configuration Manager
 """
 
-import json
+import copy
 import subprocess
 import platform
 from typing import Dict, Any
@@ -14,13 +14,15 @@ from utils import Colors, Logger
 from paths import PathManager
 from .base_config import BaseConfigManager
 
+# 确认输入
+_YES = frozenset(('y', 'yes'))
+
 
 class SystemProxyManager(BaseConfigManager):
     """系统代理配置管理器"""
     
     def __init__(self, paths: PathManager, logger: Logger):
         super().__init__(paths, logger)
-        self.advanced_config_file = self.paths.config_dir / "advanced.json"
         self.system_type = platform.system().lower()
     
     def load_system_proxy_config(self) -> Dict[str, Any]:
@@ -41,36 +43,14 @@ class SystemProxyManager(BaseConfigManager):
             "pac_url": ""
         }
         
-        if not self.advanced_config_file.exists():
-            return default_config
-        
-        try:
-            with open(self.advanced_config_file, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-                system_proxy = config.get("system_proxy", {})
-                # 合并默认配置
-                default_config.update(system_proxy)
-                return default_config
-        except (FileNotFoundError, json.JSONDecodeError):
-            return default_config
+        # 合并默认配置
+        default_config.update(self.load_advanced_json().get("system_proxy", {}))
+        return default_config
     
     def save_system_proxy_config(self, proxy_config: Dict[str, Any]):
         """保存系统代理配置"""
-        if self.advanced_config_file.exists():
-            try:
-                with open(self.advanced_config_file, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
-            except (FileNotFoundError, json.JSONDecodeError):
-                config = {}
-        else:
-            config = {}
-        
-        config["system_proxy"] = proxy_config
-        
         try:
-            self.advanced_config_file.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.advanced_config_file, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=2, ensure_ascii=False)
+            self.save_advanced_section("system_proxy", proxy_config)
         except Exception as e:
             self.logger.error(f"保存系统代理配置失败: {e}")
     
@@ -81,7 +61,8 @@ class SystemProxyManager(BaseConfigManager):
         print("管理系统级代理设置，自动配置操作系统代理")
         print()
         
-        proxy_config = self.load_system_proxy_config()
+        # 合并结果与共享缓存共用 bypass_domains 列表，编辑前先复制
+        proxy_config = copy.deepcopy(self.load_system_proxy_config())
         
         print(f"{Colors.YELLOW}当前系统代理配置:{Colors.NC}")
         print(f"  状态: {'启用' if proxy_config.get('enabled', False) else '禁用'}")
@@ -109,7 +90,7 @@ class SystemProxyManager(BaseConfigManager):
             if choice == "1":
                 current = proxy_config.get('enabled', False)
                 toggle = input(f"系统代理当前{'启用' if current else '禁用'}，是否切换? (y/N): ").strip().lower()
-                if toggle in ['y', 'yes']:
+                if toggle in _YES:
                     proxy_config['enabled'] = not current
                     status = '启用' if not current else '禁用'
                     self.logger.info(f"✓ 系统代理已{status}")
@@ -220,7 +201,7 @@ class SystemProxyManager(BaseConfigManager):
                     
         elif choice == "4":
             confirm = input("确定要重置为默认绕过域名吗? (y/N): ").strip().lower()
-            if confirm in ['y', 'yes']:
+            if confirm in _YES:
                 proxy_config['bypass_domains'] = [
                     "localhost", "127.0.0.1", "::1", "10.*", "172.16.*", "172.17.*", 
                     "172.18.*", "172.19.*", "172.20.*", "172.21.*", "172.22.*", "172.23.*",
@@ -243,7 +224,7 @@ class SystemProxyManager(BaseConfigManager):
         if choice == "1":
             current_pac = proxy_config.get('pac_enabled', False)
             toggle = input(f"PAC当前{'启用' if current_pac else '禁用'}，是否切换? (y/N): ").strip().lower()
-            if toggle in ['y', 'yes']:
+            if toggle in _YES:
                 proxy_config['pac_enabled'] = not current_pac
                 status = '启用' if not current_pac else '禁用'
                 self.logger.info(f"✓ PAC已{status}")
@@ -6,11 +6,52 @@ TUN模式配置管理模块
 TUN Mode Configuration Manager
 """
 
+import copy
 from typing import Dict, Any
-from utils import Colors, Logger
+from utils import Colors, Logger, render_lines
 from paths import PathManager
 from .base_config import BaseConfigManager
 
+# 菜单标题和状态文本
+_HDR_TUN = f"{Colors.CYAN}🚇 TUN模式配置{Colors.NC}"
+_HDR_CURRENT = f"{Colors.YELLOW}当前TUN模式状态:{Colors.NC}"
+_STATUS_ENABLED = f"  状态: {Colors.GREEN}启用{Colors.NC}"
+_STATUS_DISABLED = f"  状态: {Colors.RED}禁用{Colors.NC}"
+
+_MENU_TUN = (
+    "配置选项:",
+    "1. 启用/禁用 TUN模式",
+    "2. 设置接口名称",
+    "3. 设置MTU值",
+    "4. 配置IP地址",
+    "5. 路由设置",
+    "6. 高级设置",
+    "7. 保存并返回",
+    ""
+)
+
+_MENU_TUN_ADDRESSES = (
+    "",
+    "1. 使用统一地址格式 (推荐)",
+    "2. 使用分离地址格式",
+    "3. 返回上级"
+)
+
+_MENU_TUN_ROUTING = (
+    "",
+    "1. 切换自动路由",
+    "2. 切换严格路由",
+    "3. 配置排除路由",
+    "4. 返回上级"
+)
+
+_MENU_TUN_EXCLUDE = (
+    "",
+    "1. 添加排除包名",
+    "2. 删除排除包名",
+    "3. 返回上级"
+)
+
 
 class TUNConfigManager(BaseConfigManager):
     """TUN模式配置管理器"""
@@ -20,13 +61,10 @@ class TUNConfigManager(BaseConfigManager):
     
     def configure_tun_mode(self):
         """配置TUN模式 - 直接修改sing-box配置"""
-        print()
-        print(f"{Colors.CYAN}🚇 TUN模式配置{Colors.NC}")
-        print("配置虚拟网络接口，实现透明代理")
-        print()
+        render_lines(["", _HDR_TUN, "配置虚拟网络接口，实现透明代理", ""])
         
-        # 读取当前sing-box配置
-        config = self.load_sing_box_config()
+        # 读取当前sing-box配置 (复制一份，未保存的修改不影响缓存)
+        config = copy.deepcopy(self.load_sing_box_config())
         if not config:
             self.logger.error("未找到 sing-box 配置文件")
             return
@@ -41,11 +79,11 @@ class TUNConfigManager(BaseConfigManager):
         
         is_enabled = tun_inbound is not None
         
-        print(f"{Colors.YELLOW}当前TUN模式状态:{Colors.NC}")
+        lines = [_HDR_CURRENT]
         if is_enabled:
-            print(f"  状态: {Colors.GREEN}启用{Colors.NC}")
-            print(f"  接口名: {tun_inbound.get('interface_name', 'tun0')}")
-            print(f"  MTU: {tun_inbound.get('mtu', 9000)}")
+            lines.append(_STATUS_ENABLED)
+            lines.append(f"  接口名: {tun_inbound.get('interface_name', 'tun0')}")
+            lines.append(f"  MTU: {tun_inbound.get('mtu', 9000)}")
             
             # 处理地址格式兼容性
             address = tun_inbound.get('address')
@@ -53,47 +91,40 @@ class TUNConfigManager(BaseConfigManager):
             inet6_address = tun_inbound.get('inet6_address')
             
             if address:
-                print(f"  地址: {address}")
+                lines.append(f"  地址: {address}")
             else:
                 if inet4_address:
-                    print(f"  IPv4地址: {inet4_address}")
+                    lines.append(f"  IPv4地址: {inet4_address}")
                 if inet6_address:
-                    print(f"  IPv6地址: {inet6_address}")
+                    lines.append(f"  IPv6地址: {inet6_address}")
             
             auto_route = tun_inbound.get('auto_route', True)
             strict_route = tun_inbound.get('strict_route', True)
-            print(f"  自动路由: {'开启' if auto_route else '关闭'}")
-            print(f"  严格路由: {'开启' if strict_route else '关闭'}")
+            lines.append(f"  自动路由: {'开启' if auto_route else '关闭'}")
+            lines.append(f"  严格路由: {'开启' if strict_route else '关闭'}")
         else:
-            print(f"  状态: {Colors.RED}禁用{Colors.NC}")
-        
-        print()
+            lines.append(_STATUS_DISABLED)
+        
+        lines.append("")
+        render_lines(lines)
+        
+        handlers = {
+            "1": self._toggle_tun_mode,
+            "2": self._configure_interface_name,
+            "3": self._configure_mtu,
+            "4": self._configure_addresses,
+            "5": self._configure_routing,
+            "6": self._configure_advanced_settings
+        }
         
         while True:
-            print("配置选项:")
-            print("1. 启用/禁用 TUN模式")
-            print("2. 设置接口名称")
-            print("3. 设置MTU值")
-            print("4. 配置IP地址")
-            print("5. 路由设置")
-            print("6. 高级设置")
-            print("7. 保存并返回")
-            print()
+            render_lines(_MENU_TUN)
             
             choice = input("请选择 [1-7]: ").strip()
             
-            if choice == "1":
-                self._toggle_tun_mode(config)
-            elif choice == "2":
-                self._configure_interface_name(config)
-            elif choice == "3":
-                self._configure_mtu(config)
-            elif choice == "4":
-                self._configure_addresses(config)
-            elif choice == "5":
-                self._configure_routing(config)
-            elif choice == "6":
-                self._configure_advanced_settings(config)
+            handler = handlers.get(choice)
+            if handler is not None:
+                handler(config)
             elif choice == "7":
                 self.save_config_and_restart(config, "TUN模式配置已更新")
                 return
@@ -177,20 +208,16 @@ class TUNConfigManager(BaseConfigManager):
         current_inet4 = tun_inbound.get('inet4_address')
         current_inet6 = tun_inbound.get('inet6_address')
         
-        print()
-        print("当前地址配置:")
+        lines = ["", "当前地址配置:"]
         if current_address:
-            print(f"  统一地址格式: {current_address}")
+            lines.append(f"  统一地址格式: {current_address}")
         else:
             if current_inet4:
-                print(f"  IPv4地址: {current_inet4}")
+                lines.append(f"  IPv4地址: {current_inet4}")
             if current_inet6:
-                print(f"  IPv6地址: {current_inet6}")
-        
-        print()
-        print("1. 使用统一地址格式 (推荐)")
-        print("2. 使用分离地址格式")
-        print("3. 返回上级")
+                lines.append(f"  IPv6地址: {current_inet6}")
+        lines.extend(_MENU_TUN_ADDRESSES)
+        render_lines(lines)
         
         choice = input("请选择 [1-3]: ").strip()
         
@@ -234,16 +261,13 @@ class TUNConfigManager(BaseConfigManager):
         current_auto = tun_inbound.get("auto_route", True)
         current_strict = tun_inbound.get("strict_route", True)
         
-        print()
-        print(f"当前路由设置:")
-        print(f"  自动路由: {'开启' if current_auto else '关闭'}")
-        print(f"  严格路由: {'开启' if current_strict else '关闭'}")
-        print()
-        
-        print("1. 切换自动路由")
-        print("2. 切换严格路由")
-        print("3. 配置排除路由")
-        print("4. 返回上级")
+        render_lines([
+            "",
+            "当前路由设置:",
+            f"  自动路由: {'开启' if current_auto else '关闭'}",
+            f"  严格路由: {'开启' if current_strict else '关闭'}",
+            *_MENU_TUN_ROUTING
+        ])
         
         choice = input("请选择 [1-4]: ").strip()
         
@@ -264,15 +288,10 @@ class TUNConfigManager(BaseConfigManager):
         """配置排除路由"""
         exclude_package = tun_inbound.get("exclude_package", [])
         
-        print()
-        print("当前排除的应用包名:")
-        for i, package in enumerate(exclude_package, 1):
-            print(f"  {i}. {package}")
-        
-        print()
-        print("1. 添加排除包名")
-        print("2. 删除排除包名")
-        print("3. 返回上级")
+        lines = ["", "当前排除的应用包名:"]
+        lines.extend(f"  {i}. {package}" for i, package in enumerate(exclude_package, 1))
+        lines.extend(_MENU_TUN_EXCLUDE)
+        render_lines(lines)
         
         choice = input("请选择 [1-3]: ").strip()
         
@@ -299,23 +318,25 @@ class TUNConfigManager(BaseConfigManager):
     def _configure_advanced_settings(self, config: Dict[str, Any]):
         """配置高级设置"""
         tun_inbound = self._get_or_create_tun_inbound(config)
+        sniff = tun_inbound.get("sniff", True)
+        override = tun_inbound.get("sniff_override_destination", True)
         
-        print()
-        print("高级设置:")
-        print(f"1. 嗅探设置 (当前: {'开启' if tun_inbound.get('sniff', True) else '关闭'})")
-        print(f"2. 覆盖目标 (当前: {'开启' if tun_inbound.get('sniff_override_destination', True) else '关闭'})")
-        print("3. 返回上级")
+        render_lines([
+            "",
+            "高级设置:",
+            f"1. 嗅探设置 (当前: {'开启' if sniff else '关闭'})",
+            f"2. 覆盖目标 (当前: {'开启' if override else '关闭'})",
+            "3. 返回上级"
+        ])
         
         choice = input("请选择 [1-3]: ").strip()
         
         if choice == "1":
-            current = tun_inbound.get("sniff", True)
-            tun_inbound["sniff"] = not current
-            status = "开启" if not current else "关闭"
+            tun_inbound["sniff"] = not sniff
+            status = "开启" if not sniff else "关闭"
             self.logger.info(f"✓ 嗅探功能已{status}")
         
         elif choice == "2":
-            current = tun_inbound.get("sniff_override_destination", True)
-            tun_inbound["sniff_override_destination"] = not current
-            status = "开启" if not current else "关闭"
+            tun_inbound["sniff_override_destination"] = not override
+            status = "开启" if not override else "关闭"
             self.logger.info(f"✓ 目标覆盖已{status}") 
\ No newline at end of file
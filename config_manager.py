@@ -6,25 +6,301 @@
 SingTool Config Module
 """
 
-import json
 import socket
+import time
+from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, List
-from utils import Colors, Logger
+from typing import Dict, Any, List, Optional
+from utils import Logger, json_dumps, read_json_file, atomic_write_bytes
 from paths import PathManager
 
+try:
+    import fastjsonschema
+except ImportError:
+    fastjsonschema = None
+
+
+# 以下配置段只会被序列化，不会被修改，各次生成的配置直接共用
+
+# direct 和 block 出站
+_DIRECT_BLOCK_OUTBOUNDS = (
+    {"type": "direct", "tag": "direct"},
+    {"type": "block", "tag": "block"}
+)
+
+# 服务端模式的路由配置
+_SERVER_ROUTE_CONFIG = {
+    "rules": [
+        {"ip_cidr": ["224.0.0.0/3", "ff00::/8"], "outbound": "block"}
+    ],
+    "final": "direct"
+}
+
+# sing-box 配置的基本结构，安装了 fastjsonschema 时在导入时编译为校验函数
+_CONFIG_SCHEMA = {
+    "type": "object",
+    "required": ["inbounds", "outbounds", "route"],
+    "properties": {
+        "inbounds": {
+            "type": "array",
+            "minItems": 1,
+            "items": {
+                "type": "object",
+                "required": ["type"],
+                "properties": {
+                    "type": {"type": "string"},
+                    "tag": {"type": "string"},
+                    "listen_port": {"type": "integer", "minimum": 1, "maximum": 65535}
+                }
+            }
+        },
+        "outbounds": {
+            "type": "array",
+            "minItems": 1,
+            "items": {
+                "type": "object",
+                "required": ["type"],
+                "properties": {
+                    "type": {"type": "string"},
+                    "tag": {"type": "string"},
+                    "server_port": {"type": "integer", "minimum": 1, "maximum": 65535}
+                }
+            }
+        },
+        "route": {"type": "object"}
+    }
+}
+
+_validate_schema = fastjsonschema.compile(_CONFIG_SCHEMA) if fastjsonschema is not None else None
+
+# 未安装 fastjsonschema 时按 _CONFIG_SCHEMA 的同样规则逐项检查: 配置段 -> (名称, 端口字段)
+_CONFIG_SECTIONS = {
+    "inbounds": ("入站", "listen_port"),
+    "outbounds": ("出站", "server_port")
+}
+
+
+def _check_config_structure(config: Any) -> Optional[str]:
+    """按 _CONFIG_SCHEMA 的规则检查配置，返回第一个错误的描述，通过时返回 None"""
+    if not isinstance(config, dict):
+        return "配置必须是对象"
+    
+    for key in ("inbounds", "outbounds", "route"):
+        if key not in config:
+            return f"配置文件缺少必需字段: {key}"
+    
+    for key, (name, port_key) in _CONFIG_SECTIONS.items():
+        items = config[key]
+        if not isinstance(items, list):
+            return f"{key} 必须是数组"
+        if not items:
+            return f"配置文件中没有定义{name}规则"
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                return f"{key}[{index}] 必须是对象"
+            if not isinstance(item.get("type"), str):
+                return f"{key}[{index}] 缺少字符串类型的 type"
+            if "tag" in item and not isinstance(item["tag"], str):
+                return f"{key}[{index}].tag 必须是字符串"
+            if port_key in item:
+                port = item[port_key]
+                # 与 JSON Schema 一致: 80.0 也算整数，bool 虽是 int 的子类但不算
+                is_integer = (
+                    isinstance(port, int) and not isinstance(port, bool)
+                    or isinstance(port, float) and port.is_integer()
+                )
+                if not is_integer or not 1 <= port <= 65535:
+                    return f"{key}[{index}].{port_key} 必须是 1-65535 之间的整数"
+    
+    if not isinstance(config["route"], dict):
+        return "route 必须是对象"
+    return None
+
+# 本机 IP 的缓存有效期 (秒)，过期后重新探测以跟随网络切换
+_LOCAL_IP_TTL = 60
+
+# 使用 TLS 的服务端类型: 类型 -> (入站标签, 用户字段)
+_TLS_SERVER_KINDS = {
+    "trojan": ("trojan-in", "password"),
+    "vless": ("vless-in", "uuid")
+}
+
+# 无法加载高级配置时使用的默认入站、DNS和路由配置
+_DEFAULT_INBOUNDS = (
+    {
+        "type": "mixed",
+        "tag": "mixed-in",
+        "listen": "127.0.0.1",
+        "listen_port": 7890,
+        "sniff": True,
+        "sniff_override_destination": True
+    },
+)
+
+_DEFAULT_DNS_CONFIG = {
+    "servers": [
+        {"tag": "cloudflare", "address": "https://1.1.1.1/dns-query"},
+        {"tag": "local", "address": "223.5.5.5", "detour": "direct"}
+    ],
+    "rules": [
+        {"domain_suffix": [".cn", ".中国"], "server": "local"},
+        {"clash_mode": "direct", "server": "local"},
+        {"clash_mode": "global", "server": "cloudflare"}
+    ],
+    "final": "cloudflare"
+}
+
+_DEFAULT_ROUTE_CONFIG = {
+    "rules": [
+        {"ip_cidr": ["224.0.0.0/3", "ff00::/8"], "outbound": "block"},
+        # 出站相同的相邻规则合并为一条，sing-box 对同一规则内的多个匹配字段取"或"
+        {
+            "ip_cidr": [
+                "127.0.0.0/8", "169.254.0.0/16", "224.0.0.0/4", "::1/128", "fc00::/7", "fe80::/10", "ff00::/8",
+                "10.0.0.0/8", "172.16.0.0/12", "192.168.0.0/16"
+            ],
+            "outbound": "direct"
+        },
+        {
+            "domain": ["qq.com", "baidu.com", "taobao.com", "tmall.com", "jd.com"],
+            "domain_suffix": [".cn", ".中国", ".公司", ".网络"],
+            "domain_keyword": ["cn", "china"],
+            "outbound": "direct"
+        }
+    ],
+    "final": "🚀 节点选择",
+    "auto_detect_interface": True
+}
+
+
+# 节点未配置传输方式或请求头时使用的空字典，只读
+_EMPTY_DICT = {}
+
+
+def _build_trojan_outbound(node: Dict[str, Any]) -> Dict[str, Any]:
+    """生成 Trojan 出站配置"""
+    outbound = {
+        "type": "trojan",
+        "tag": node['name'],
+        "server": node['server'],
+        "server_port": node['port'],
+        "password": node['password'],
+        "tls": {
+            "enabled": True,
+            "server_name": node.get('sni', node['server']),
+            "insecure": node.get('skip_cert_verify', True)
+        }
+    }
+    
+    # 添加WebSocket传输配置
+    transport = node.get('transport') or _EMPTY_DICT
+    if transport.get('type') == 'ws':
+        outbound["transport"] = {
+            "type": "ws",
+            "path": transport.get('path', '/'),
+            "headers": transport.get('headers') or _EMPTY_DICT
+        }
+    return outbound
+
+
+def _build_vless_outbound(node: Dict[str, Any]) -> Dict[str, Any]:
+    """生成 VLESS 出站配置"""
+    outbound = {
+        "type": "vless",
+        "tag": node['name'],
+        "server": node['server'],
+        "server_port": node['port'],
+        "uuid": node['uuid'],
+        "flow": node.get('flow', ''),
+        "tls": {
+            "enabled": True,
+            "server_name": node.get('sni', node['server']),
+            "insecure": node.get('skip_cert_verify', True)
+        }
+    }
+    
+    # 添加传输配置
+    transport = node.get('transport') or _EMPTY_DICT
+    transport_type = transport.get('type')
+    if transport_type == 'ws':
+        outbound["transport"] = {
+            "type": "ws",
+            "path": transport.get('path', '/'),
+            "headers": transport.get('headers') or _EMPTY_DICT
+        }
+    elif transport_type == 'grpc':
+        outbound["transport"] = {
+            "type": "grpc",
+            "service_name": transport.get('service_name', '')
+        }
+    return outbound
+
+
+def _build_shadowsocks_outbound(node: Dict[str, Any]) -> Dict[str, Any]:
+    """生成 Shadowsocks 出站配置"""
+    return {
+        "type": "shadowsocks",
+        "tag": node['name'],
+        "server": node['server'],
+        "server_port": node['port'],
+        "method": node['method'],
+        "password": node['password']
+    }
+
+
+# 节点类型 -> 出站配置生成函数
+_OUTBOUND_BUILDERS = {
+    "trojan": _build_trojan_outbound,
+    "vless": _build_vless_outbound,
+    "shadowsocks": _build_shadowsocks_outbound
+}
+
+
 class ConfigManager:
     """配置管理类 - 负责生成和管理 sing-box 配置文件"""
     
     def __init__(self, paths: PathManager, logger: Logger):
         self.paths = paths
         self.logger = logger
+        
+        # 仅依赖路径的配置段，每个实例生成一次
+        self._log_config = {
+            "level": "info",
+            "timestamp": True,
+            "output": str(self.paths.log_dir / "sing-box.log")
+        }
+        self._default_experimental_config = {
+            "clash_api": {
+                "external_controller": "127.0.0.1:9090",
+                "external_ui": "ui",
+                "secret": "",
+                "default_mode": "rule"
+            },
+            "cache_file": {
+                "enabled": True,
+                "path": str(self.paths.config_dir / "cache.db"),
+                "cache_id": "default",
+                "store_fakeip": False
+            }
+        }
+        
+        # 本机 IP 探测结果: (IP, 探测时间)
+        self._local_ip = None
+        
+        # 本实例已创建或确认存在的目录
+        self._ensured_dirs = set()
+    
+    def _ensure_dir(self, dir_path: Path):
+        """创建目录，同一目录只检查一次"""
+        if dir_path not in self._ensured_dirs:
+            dir_path.mkdir(parents=True, exist_ok=True)
+            self._ensured_dirs.add(dir_path)
     
     def ensure_config_directories(self):
         """确保配置目录存在"""
-        for dir_path in [self.paths.config_dir, self.paths.log_dir, 
-                        self.paths.backup_dir, self.paths.nodes_dir]:
-            dir_path.mkdir(parents=True, exist_ok=True)
+        for dir_path in (self.paths.config_dir, self.paths.log_dir,
+                         self.paths.backup_dir, self.paths.nodes_dir):
+            self._ensure_dir(dir_path)
         self.logger.info("✓ 配置目录检查完成")
     
     def generate_local_proxy_config(self, selected_nodes: List[Dict[str, Any]]) -> Dict[str, Any]:
@@ -41,170 +317,53 @@ class ConfigManager:
             # 如果导入失败，使用默认配置
             advanced_manager = None
         
-        # 外出连接配置
-        outbounds = []
-        
-        # 添加选择的节点
-        for node in selected_nodes:
-            if node['type'] == 'trojan':
-                outbound = {
-                    "type": "trojan",
-                    "tag": node['name'],
-                    "server": node['server'],
-                    "server_port": node['port'],
-                    "password": node['password'],
-                    "tls": {
-                        "enabled": True,
-                        "server_name": node.get('sni', node['server']),
-                        "insecure": node.get('skip_cert_verify', True)
-                    }
-                }
-                
-                # 添加WebSocket传输配置
-                if 'transport' in node and node['transport'].get('type') == 'ws':
-                    outbound["transport"] = {
-                        "type": "ws",
-                        "path": node['transport'].get('path', '/'),
-                        "headers": node['transport'].get('headers', {})
-                    }
-                    
-            elif node['type'] == 'vless':
-                outbound = {
-                    "type": "vless",
-                    "tag": node['name'],
-                    "server": node['server'],
-                    "server_port": node['port'],
-                    "uuid": node['uuid'],
-                    "flow": node.get('flow', ''),
-                    "tls": {
-                        "enabled": True,
-                        "server_name": node.get('sni', node['server']),
-                        "insecure": node.get('skip_cert_verify', True)
-                    }
-                }
-                
-                # 添加传输配置
-                if 'transport' in node:
-                    if node['transport'].get('type') == 'ws':
-                        outbound["transport"] = {
-                            "type": "ws",
-                            "path": node['transport'].get('path', '/'),
-                            "headers": node['transport'].get('headers', {})
-                        }
-                    elif node['transport'].get('type') == 'grpc':
-                        outbound["transport"] = {
-                            "type": "grpc",
-                            "service_name": node['transport'].get('service_name', '')
-                        }
-                        
-            elif node['type'] == 'shadowsocks':
-                outbound = {
-                    "type": "shadowsocks",
-                    "tag": node['name'],
-                    "server": node['server'],
-                    "server_port": node['port'],
-                    "method": node['method'],
-                    "password": node['password']
-                }
-            else:
-                continue
-            
-            outbounds.append(outbound)
-        
-        # 添加 direct 和 block 出站
-        outbounds.extend([
-            {"type": "direct", "tag": "direct"},
-            {"type": "block", "tag": "block"}
-        ])
+        # 不支持的节点类型跳过，选择器中也不引用
+        supported_nodes = [node for node in selected_nodes if node['type'] in _OUTBOUND_BUILDERS]
         
         # 生成选择器配置
-        proxy_tags = [node['name'] for node in selected_nodes]
         selector_outbound = {
             "type": "selector",
             "tag": "🚀 节点选择",
-            "outbounds": proxy_tags + ["direct"]
+            "outbounds": [node['name'] for node in supported_nodes] + ["direct"]
         }
-        outbounds.insert(0, selector_outbound)
+        
+        # 外出连接配置: 选择器、各节点、direct 和 block
+        outbounds = [
+            selector_outbound,
+            *(_OUTBOUND_BUILDERS[node['type']](node) for node in supported_nodes),
+            *_DIRECT_BLOCK_OUTBOUNDS
+        ]
         
         # 使用高级配置生成入站配置
         if advanced_manager:
             inbounds = advanced_manager.generate_inbounds_config()
         else:
             # 默认入站配置
-            inbounds = [
-                {
-                    "type": "mixed",
-                    "tag": "mixed-in",
-                    "listen": "127.0.0.1",
-                    "listen_port": 7890,
-                    "sniff": True,
-                    "sniff_override_destination": True
-                }
-            ]
+            inbounds = list(_DEFAULT_INBOUNDS)
         
         # 使用高级配置生成DNS配置
         if advanced_manager:
             dns_config = advanced_manager.generate_dns_config()
         else:
             # 默认DNS配置
-            dns_config = {
-                "servers": [
-                    {"tag": "cloudflare", "address": "https://1.1.1.1/dns-query"},
-                    {"tag": "local", "address": "223.5.5.5", "detour": "direct"}
-                ],
-                "rules": [
-                    {"domain_suffix": [".cn", ".中国"], "server": "local"},
-                    {"clash_mode": "direct", "server": "local"},
-                    {"clash_mode": "global", "server": "cloudflare"}
-                ],
-                "final": "cloudflare"
-            }
+            dns_config = _DEFAULT_DNS_CONFIG
         
         # 使用高级配置生成路由配置
         if advanced_manager:
             route_config = advanced_manager.generate_route_config()
         else:
             # 默认路由配置
-            route_rules = [
-                {"ip_cidr": ["224.0.0.0/3", "ff00::/8"], "outbound": "block"},
-                {"ip_cidr": ["127.0.0.0/8", "169.254.0.0/16", "224.0.0.0/4", "::1/128", "fc00::/7", "fe80::/10", "ff00::/8"], "outbound": "direct"},
-                {"ip_cidr": ["10.0.0.0/8", "172.16.0.0/12", "192.168.0.0/16"], "outbound": "direct"},
-                {"domain_keyword": ["cn", "china"], "outbound": "direct"},
-                {"domain_suffix": [".cn", ".中国", ".公司", ".网络"], "outbound": "direct"},
-                {"domain": ["qq.com", "baidu.com", "taobao.com", "tmall.com", "jd.com"], "outbound": "direct"}
-            ]
-            route_config = {
-                "rules": route_rules,
-                "final": "🚀 节点选择",
-                "auto_detect_interface": True
-            }
+            route_config = _DEFAULT_ROUTE_CONFIG
         
         # 使用高级配置生成实验性功能配置
         if advanced_manager:
             experimental_config = advanced_manager.generate_experimental_config()
         else:
             # 默认实验性配置
-            experimental_config = {
-                "clash_api": {
-                    "external_controller": "127.0.0.1:9090",
-                    "external_ui": "ui",
-                    "secret": "",
-                    "default_mode": "rule"
-                },
-                "cache_file": {
-                    "enabled": True,
-                    "path": str(self.paths.config_dir / "cache.db"),
-                    "cache_id": "default",
-                    "store_fakeip": False
-                }
-            }
+            experimental_config = self._default_experimental_config
         
         config = {
-            "log": {
-                "level": "info",
-                "timestamp": True,
-                "output": str(self.paths.log_dir / "sing-box.log")
-            },
+            "log": self._log_config,
             "experimental": experimental_config,
             "dns": dns_config,
             "inbounds": inbounds,
@@ -216,75 +375,53 @@ class ConfigManager:
     
     def generate_local_server_config(self, server_type: str, config_data: Dict[str, Any]) -> Dict[str, Any]:
         """生成本地服务器配置（服务端模式）"""
-        if server_type == "trojan":
-            return self._generate_trojan_server_config(config_data)
+        if server_type in _TLS_SERVER_KINDS:
+            return self._generate_tls_server_config(server_type, config_data)
         elif server_type == "shadowsocks":
             return self._generate_shadowsocks_server_config(config_data)
-        elif server_type == "vless":
-            return self._generate_vless_server_config(config_data)
         else:
             self.logger.error(f"不支持的服务器类型: {server_type}")
             return {}
     
-    def _generate_trojan_server_config(self, config_data: Dict[str, Any]) -> Dict[str, Any]:
-        """生成 Trojan 服务器配置"""
-        config = {
-            "log": {
-                "level": "info",
-                "timestamp": True,
-                "output": str(self.paths.log_dir / "sing-box.log")
-            },
+    def _generate_tls_server_config(self, server_type: str, config_data: Dict[str, Any]) -> Dict[str, Any]:
+        """生成 Trojan / VLESS 服务器配置"""
+        tag, user_field = _TLS_SERVER_KINDS[server_type]
+        domain = config_data['domain']
+        
+        # 提供了证书路径时使用该证书，否则使用自动证书
+        tls = {"enabled": True, "server_name": domain}
+        if config_data.get('cert_path'):
+            tls["certificate_path"] = config_data['cert_path']
+            tls["key_path"] = config_data.get('key_path', '')
+        else:
+            tls["acme"] = {
+                "domain": [domain],
+                "data_directory": str(self.paths.config_dir / "acme"),
+                "default_server_name": domain
+            }
+        
+        return {
+            "log": self._log_config,
             "inbounds": [
                 {
-                    "type": "trojan",
-                    "tag": "trojan-in",
+                    "type": server_type,
+                    "tag": tag,
                     "listen": "0.0.0.0",
                     "listen_port": config_data['port'],
                     "users": [
-                        {"password": config_data['password']}
+                        {user_field: config_data[user_field]}
                     ],
-                    "tls": {
-                        "enabled": True,
-                        "server_name": config_data['domain'],
-                        "certificate_path": config_data.get('cert_path', ''),
-                        "key_path": config_data.get('key_path', ''),
-                        "acme": {
-                            "domain": [config_data['domain']],
-                            "data_directory": str(self.paths.config_dir / "acme"),
-                            "default_server_name": config_data['domain']
-                        } if not config_data.get('cert_path') else None
-                    }
+                    "tls": tls
                 }
             ],
-            "outbounds": [
-                {"type": "direct", "tag": "direct"},
-                {"type": "block", "tag": "block"}
-            ],
-            "route": {
-                "rules": [
-                    {"ip_cidr": ["224.0.0.0/3", "ff00::/8"], "outbound": "block"}
-                ],
-                "final": "direct"
-            }
+            "outbounds": list(_DIRECT_BLOCK_OUTBOUNDS),
+            "route": _SERVER_ROUTE_CONFIG
         }
-        
-        # 如果没有提供证书路径，移除证书配置，使用自动证书
-        if not config_data.get('cert_path'):
-            del config['inbounds'][0]['tls']['certificate_path']
-            del config['inbounds'][0]['tls']['key_path']
-        else:
-            del config['inbounds'][0]['tls']['acme']
-        
-        return config
     
     def _generate_shadowsocks_server_config(self, config_data: Dict[str, Any]) -> Dict[str, Any]:
         """生成 Shadowsocks 服务器配置"""
         return {
-            "log": {
-                "level": "info",
-                "timestamp": True,
-                "output": str(self.paths.log_dir / "sing-box.log")
-            },
+            "log": self._log_config,
             "inbounds": [
                 {
                     "type": "shadowsocks",
@@ -295,69 +432,10 @@ class ConfigManager:
                     "password": config_data['password']
                 }
             ],
-            "outbounds": [
-                {"type": "direct", "tag": "direct"},
-                {"type": "block", "tag": "block"}
-            ],
-            "route": {
-                "rules": [
-                    {"ip_cidr": ["224.0.0.0/3", "ff00::/8"], "outbound": "block"}
-                ],
-                "final": "direct"
-            }
+            "outbounds": list(_DIRECT_BLOCK_OUTBOUNDS),
+            "route": _SERVER_ROUTE_CONFIG
         }
     
-    def _generate_vless_server_config(self, config_data: Dict[str, Any]) -> Dict[str, Any]:
-        """生成 VLESS 服务器配置"""
-        config = {
-            "log": {
-                "level": "info",
-                "timestamp": True,
-                "output": str(self.paths.log_dir / "sing-box.log")
-            },
-            "inbounds": [
-                {
-                    "type": "vless",
-                    "tag": "vless-in",
-                    "listen": "0.0.0.0",
-                    "listen_port": config_data['port'],
-                    "users": [
-                        {"uuid": config_data['uuid']}
-                    ],
-                    "tls": {
-                        "enabled": True,
-                        "server_name": config_data['domain'],
-                        "certificate_path": config_data.get('cert_path', ''),
-                        "key_path": config_data.get('key_path', ''),
-                        "acme": {
-                            "domain": [config_data['domain']],
-                            "data_directory": str(self.paths.config_dir / "acme"),
-                            "default_server_name": config_data['domain']
-                        } if not config_data.get('cert_path') else None
-                    }
-                }
-            ],
-            "outbounds": [
-                {"type": "direct", "tag": "direct"},
-                {"type": "block", "tag": "block"}
-            ],
-            "route": {
-                "rules": [
-                    {"ip_cidr": ["224.0.0.0/3", "ff00::/8"], "outbound": "block"}
-                ],
-                "final": "direct"
-            }
-        }
-        
-        # 如果没有提供证书路径，移除证书配置，使用自动证书
-        if not config_data.get('cert_path'):
-            del config['inbounds'][0]['tls']['certificate_path']
-            del config['inbounds'][0]['tls']['key_path']
-        else:
-            del config['inbounds'][0]['tls']['acme']
-        
-        return config
-    
     def save_config(self, config: Dict[str, Any], config_path: Path = None) -> bool:
         """保存配置文件"""
         if config_path is None:
@@ -365,11 +443,10 @@ class ConfigManager:
         
         try:
             # 确保目录存在
-            config_path.parent.mkdir(parents=True, exist_ok=True)
+            self._ensure_dir(config_path.parent)
             
-            # 保存配置
-            with open(config_path, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=2, ensure_ascii=False)
+            # 保存配置 (直接写入UTF-8字节，sing-box 不会读到写了一半的文件)
+            atomic_write_bytes(config_path, json_dumps(config))
             
             self.logger.info(f"✓ 配置文件已保存: {config_path}")
             return True
@@ -387,17 +464,15 @@ class ConfigManager:
             return True
         
         try:
-            import datetime
-            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             backup_name = f"config_backup_{timestamp}.json"
             backup_path = self.paths.backup_dir / backup_name
             
             # 确保备份目录存在
-            self.paths.backup_dir.mkdir(parents=True, exist_ok=True)
+            self._ensure_dir(self.paths.backup_dir)
             
-            # 复制文件
-            import shutil
-            shutil.copy2(config_path, backup_path)
+            # 复制文件内容 (备份文件名已带时间戳，无需保留文件元数据)
+            atomic_write_bytes(backup_path, config_path.read_bytes())
             
             self.logger.info(f"✓ 配置已备份: {backup_name}")
             return True
@@ -410,45 +485,51 @@ class ConfigManager:
         if config_path is None:
             config_path = self.paths.main_config
         
-        if not config_path.exists():
+        try:
+            return read_json_file(config_path)
+        except FileNotFoundError:
             self.logger.warn(f"配置文件不存在: {config_path}")
             return {}
-        
-        try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-            return config
         except Exception as e:
             self.logger.error(f"加载配置文件失败: {e}")
             return {}
     
     def validate_config(self, config: Dict[str, Any]) -> bool:
         """验证配置文件格式"""
-        required_keys = ['inbounds', 'outbounds', 'route']
-        for key in required_keys:
-            if key not in config:
-                self.logger.error(f"配置文件缺少必需字段: {key}")
+        if _validate_schema is not None:
+            try:
+                _validate_schema(config)
+            except fastjsonschema.JsonSchemaException as e:
+                self.logger.error(f"配置文件格式错误: {e.message}")
                 return False
+            
+            self.logger.info("✓ 配置文件格式验证通过")
+            return True
         
-        if not config['inbounds']:
-            self.logger.error("配置文件中没有定义入站规则")
-            return False
-        
-        if not config['outbounds']:
-            self.logger.error("配置文件中没有定义出站规则")
+        # 未安装 fastjsonschema 时按同样的规则逐项检查
+        error = _check_config_structure(config)
+        if error is not None:
+            self.logger.error(f"配置文件格式错误: {error}")
             return False
         
         self.logger.info("✓ 配置文件格式验证通过")
         return True
     
     def get_local_ip(self) -> str:
-        """获取本机 IP 地址"""
+        """获取本机 IP 地址，探测结果缓存 _LOCAL_IP_TTL 秒"""
+        now = time.monotonic()
+        if self._local_ip is not None and now - self._local_ip[1] < _LOCAL_IP_TTL:
+            return self._local_ip[0]
+        
         try:
             # 创建一个连接来获取本地IP
             s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
             s.connect(("8.8.8.8", 80))
             local_ip = s.getsockname()[0]
             s.close()
-            return local_ip
         except:
-            return "127.0.0.1" 
\ No newline at end of file
+            # 探测失败不缓存，下次调用时重试
+            return "127.0.0.1"
+        
+        self._local_ip = (local_ip, now)
+        return local_ip 
\ No newline at end of file
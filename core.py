@@ -6,19 +6,11 @@ SingTool核心管理器 - 统一管理所有功能模块
 Core Manager for SingTool
 """
 
-import os
-import sys
 import platform
 import subprocess
-import time
-import socket
-import shutil
-import json
-from datetime import datetime
-from typing import Dict, Any, List, Optional
-from threading import Thread, Event
-from pathlib import Path
-from utils import Colors, Logger
+from typing import Dict, Any
+from threading import Event
+from utils import Colors, Logger, json_loads, json_dumps
 from paths import PathManager
 from config_manager import ConfigManager
 from nodes import NodeManager
@@ -283,10 +275,8 @@ class SingToolManager:
         config_ports = []
         try:
             if self.paths.main_config.exists():
-                with open(self.paths.main_config, 'r', encoding='utf-8') as f:
-                    import json
-                    config = json.load(f)
-                    
+                config = json_loads(self.paths.main_config.read_bytes())
+                
                 # 提取入站端口
                 for inbound in config.get('inbounds', []):
                     port = inbound.get('listen_port')
@@ -486,8 +476,7 @@ class SingToolManager:
                 "stack": "mixed"
             }
             
-            with open(self.paths.local_config, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=2, ensure_ascii=False)
+            self.paths.local_config.write_bytes(json_dumps(config))
             
             self.logger.info("✓ 创建默认本地代理配置 (混合端口: 7890)")
         
@@ -521,8 +510,7 @@ class SingToolManager:
                 "strategy": "prefer_ipv4"
             }
             
-            with open(self.paths.dns_config, 'w', encoding='utf-8') as f:
-                json.dump(dns_config, f, indent=2, ensure_ascii=False)
+            self.paths.dns_config.write_bytes(json_dumps(dns_config))
             
             self.logger.info("✓ 创建默认DNS配置")
         
@@ -570,8 +558,7 @@ class SingToolManager:
     def _show_connection_info(self):
         """显示连接信息"""
         try:
-            with open(self.paths.local_config, 'r', encoding='utf-8') as f:
-                local_config = json.load(f)
+            local_config = json_loads(self.paths.local_config.read_bytes())
             
             print(f"{Colors.CYAN}代理配置信息:{Colors.NC}")
             
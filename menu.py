@@ -9,11 +9,13 @@ SingTool Menu Module - 2-Level Menu System
 import os
 import sys
 import time
-import json
-from utils import Colors, Logger
+from utils import Colors, Logger, json_loads
 from advanced_config import AdvancedConfigManager
 from rich_menu import RichMenu
 
+# 默认出站选项
+_OUTBOUND_MAP = {"1": "🚀 节点选择", "2": "direct", "3": "block"}
+
 class MenuSystem:
     """菜单系统类 - 提供2级交互式用户界面"""
     
@@ -21,6 +23,13 @@ class MenuSystem:
         self.manager = manager
         self.node_manager = node_manager
         self.rich_menu = RichMenu()
+        self._advanced_manager = None
+    
+    def _get_advanced_manager(self) -> AdvancedConfigManager:
+        """返回共享的高级配置管理器，使各菜单复用同一份配置缓存"""
+        if self._advanced_manager is None:
+            self._advanced_manager = AdvancedConfigManager(self.manager.paths, self.manager.logger)
+        return self._advanced_manager
     
     def show_main_menu(self):
         """显示主菜单 - 第1级"""
@@ -404,16 +413,14 @@ class MenuSystem:
 
     def _full_routing_management(self):
         """完整分流管理"""
-        advanced_manager = AdvancedConfigManager(self.manager.paths, self.manager.logger)
+        advanced_manager = self._get_advanced_manager()
         advanced_manager.configure_routing_rules()
 
     def _get_proxy_port_info(self):
         """获取代理端口信息"""
         try:
             if self.manager.paths.main_config.exists():
-                import json
-                with open(self.manager.paths.main_config, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
+                config = json_loads(self.manager.paths.main_config.read_bytes())
                 
                 # 提取入站端口信息
                 port_list = []
@@ -929,22 +936,22 @@ class MenuSystem:
     
     def _proxy_ports_config(self):
         """代理端口配置"""
-        advanced_manager = AdvancedConfigManager(self.manager.paths, self.manager.logger)
+        advanced_manager = self._get_advanced_manager()
         advanced_manager.configure_proxy_ports()
     
     def _dns_fakeip_config(self):
         """DNS 和 FakeIP 设置"""
-        advanced_manager = AdvancedConfigManager(self.manager.paths, self.manager.logger)
+        advanced_manager = self._get_advanced_manager()
         advanced_manager.configure_dns_fakeip()
     
     def _tun_mode_config(self):
         """TUN 模式配置"""
-        advanced_manager = AdvancedConfigManager(self.manager.paths, self.manager.logger)
+        advanced_manager = self._get_advanced_manager()
         advanced_manager.configure_tun_mode()
     
     def _clash_api_config(self):
         """Clash API 设置"""
-        advanced_manager = AdvancedConfigManager(self.manager.paths, self.manager.logger)
+        advanced_manager = self._get_advanced_manager()
         advanced_manager.configure_clash_api()
     
     def _view_current_config(self):
@@ -1010,13 +1017,13 @@ class MenuSystem:
     
     def _view_split_rules_menu(self):
         """查看分流规则菜单"""
-        advanced_manager = AdvancedConfigManager(self.manager.paths, self.manager.logger)
+        advanced_manager = self._get_advanced_manager()
         routing_config = advanced_manager.load_advanced_config().get("routing", {})
         advanced_manager._view_all_rule_sets(routing_config)
     
     def _add_custom_rule_menu(self):
         """添加自定义规则菜单"""
-        advanced_manager = AdvancedConfigManager(self.manager.paths, self.manager.logger)
+        advanced_manager = self._get_advanced_manager()
         config = advanced_manager.load_advanced_config()
         routing_config = config.get("routing", {})
         advanced_manager._add_custom_rule(routing_config)
@@ -1032,7 +1039,7 @@ class MenuSystem:
     
     def _edit_rule_group_menu(self):
         """编辑规则组菜单"""
-        advanced_manager = AdvancedConfigManager(self.manager.paths, self.manager.logger)
+        advanced_manager = self._get_advanced_manager()
         config = advanced_manager.load_advanced_config()
         routing_config = config.get("routing", {})
         advanced_manager._edit_rule_set(routing_config)
@@ -1047,7 +1054,7 @@ class MenuSystem:
     
     def _split_settings_menu(self):
         """分流设置菜单"""
-        advanced_manager = AdvancedConfigManager(self.manager.paths, self.manager.logger)
+        advanced_manager = self._get_advanced_manager()
         config = advanced_manager.load_advanced_config()
         routing_config = config.get("routing", {})
         
@@ -1075,8 +1082,7 @@ class MenuSystem:
             print("3. block - 拦截")
             
             outbound_choice = input("请选择 [1-3]: ").strip()
-            outbound_map = {"1": "🚀 节点选择", "2": "direct", "3": "block"}
-            new_outbound = outbound_map.get(outbound_choice)
+            new_outbound = _OUTBOUND_MAP.get(outbound_choice)
             
             if new_outbound:
                 routing_config["final_outbound"] = new_outbound
@@ -1108,12 +1114,12 @@ class MenuSystem:
     
     def _media_routing_management(self):
         """媒体分流管理"""
-        advanced_manager = AdvancedConfigManager(self.manager.paths, self.manager.logger)
+        advanced_manager = self._get_advanced_manager()
         advanced_manager.configure_media_routing_rules()
     
     def _application_routing_management(self):
         """程序分流管理"""
-        advanced_manager = AdvancedConfigManager(self.manager.paths, self.manager.logger)
+        advanced_manager = self._get_advanced_manager()
         advanced_manager.configure_application_routing_rules()
     
     def show_help(self):
@@ -1183,20 +1189,13 @@ class MenuSystem:
                     "Clash API": "[yellow]○ 无配置[/yellow]"
                 }
             
-            import json
-            with open(config_file, 'r', encoding='utf-8') as f:
-                config = json.load(f)
+            config = json_loads(config_file.read_bytes())
             
             # 检查系统代理设置 - 从高级配置文件读取
             try:
-                advanced_config_file = self.manager.paths.config_dir / "advanced.json"
-                system_proxy_enabled = False
-                
-                if advanced_config_file.exists():
-                    with open(advanced_config_file, 'r', encoding='utf-8') as f:
-                        advanced_config = json.load(f)
-                        system_proxy_config = advanced_config.get("system_proxy", {})
-                        system_proxy_enabled = system_proxy_config.get("enabled", False)
+                # 复用高级配置管理器的缓存，不再单独解析 advanced.json
+                system_proxy_config = self._get_advanced_manager().load_system_proxy_config()
+                system_proxy_enabled = system_proxy_config.get("enabled", False)
                 
                 if system_proxy_enabled:
                     system_proxy_status = "[green]✓ 已启用[/green]"
@@ -1537,7 +1536,7 @@ class MenuSystem:
 
     def _system_proxy_config(self):
         """系统代理配置"""
-        advanced_manager = AdvancedConfigManager(self.manager.paths, self.manager.logger)
+        advanced_manager = self._get_advanced_manager()
         advanced_manager.configure_system_proxy()
         self.manager.logger.info("✓ 系统代理配置已保存")
         input("按回车键继续...") 
\ No newline at end of file
@@ -3,7 +3,6 @@
 Refactored Node Manager
 """
 
-import json
 import shutil
 import time
 import threading
@@ -12,7 +11,7 @@ from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
-from utils import Colors, Logger
+from utils import Colors, Logger, json_loads, json_dumps
 from paths import PathManager
 from rich_menu import RichMenu
 
@@ -72,8 +71,7 @@ class NodeManager:
                 "nodes": {}
             }
             
-            with open(self.paths.nodes_config, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=2, ensure_ascii=False)
+            self.paths.nodes_config.write_bytes(json_dumps(config))
             
             self.logger.info("✓ 创建空节点配置文件")
             self.logger.info("✓ 请通过菜单添加您需要的节点")
@@ -83,9 +81,8 @@ class NodeManager:
     def load_nodes_config(self) -> Dict:
         """加载节点配置"""
         try:
-            with open(self.paths.nodes_config, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
+            return json_loads(self.paths.nodes_config.read_bytes())
+        except (FileNotFoundError, ValueError):
             return {"version": "1.0", "current_node": None, "nodes": {}}
     
     def save_nodes_config(self, config: Dict):
@@ -96,8 +93,7 @@ class NodeManager:
             self.paths.backup_dir.mkdir(parents=True, exist_ok=True)
             shutil.copy2(self.paths.nodes_config, backup_file)
         
-        with open(self.paths.nodes_config, 'w', encoding='utf-8') as f:
-            json.dump(config, f, indent=2, ensure_ascii=False)
+        self.paths.nodes_config.write_bytes(json_dumps(config))
     
     def show_nodes(self):
         """显示节点列表"""
@@ -422,9 +418,7 @@ class NodeManager:
     def _load_cache(self, cache_file: Path) -> dict:
         """加载缓存文件"""
         try:
-            if cache_file.exists():
-                with open(cache_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+            return json_loads(cache_file.read_bytes())
         except Exception:
             pass
         return {}
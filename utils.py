@@ -6,6 +6,16 @@
 SingTool Utils Module
 """
 
+import json
+import mmap
+import os
+import sys
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 class Colors:
     """终端颜色定义"""
     RED = '\033[0;31m'
@@ -37,4 +47,102 @@ class Logger:
     @staticmethod
     def step(message):
         """显示步骤日志"""
-        print(f"{Colors.BLUE}[STEP]{Colors.NC} {message}") 
\ No newline at end of file
+        print(f"{Colors.BLUE}[STEP]{Colors.NC} {message}") 
+
+
+def render_lines(lines):
+    """一次性输出多行文本，减少终端写入次数"""
+    sys.stdout.write("\n".join(lines) + "\n")
+
+
+# 需要驻留的字符串列表字段 (域名会在多个规则组中重复出现)
+_INTERN_LIST_KEYS = frozenset(("domain", "domain_suffix", "domain_keyword"))
+
+# 需要驻留的字符串字段 (出站只有少数几种取值，却出现在每条规则中)
+_INTERN_VALUE_KEYS = frozenset(("outbound",))
+
+
+def intern_strings(obj):
+    """原地驻留配置中的域名和出站字符串，使重复出现的值共享同一个对象
+    
+    字段名由JSON解析器在同一文档内复用，无需再处理
+    """
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            if isinstance(value, str):
+                if key in _INTERN_VALUE_KEYS:
+                    obj[key] = sys.intern(value)
+            elif key in _INTERN_LIST_KEYS and isinstance(value, list):
+                value[:] = [sys.intern(v) if isinstance(v, str) else v for v in value]
+            else:
+                intern_strings(value)
+    elif isinstance(obj, list):
+        for item in obj:
+            intern_strings(item)
+
+
+def json_loads(data):
+    """解析JSON数据，优先使用orjson"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+# 超过该大小的JSON文件通过 mmap 交给 orjson 解析，省去一次整文件复制
+_MMAP_MIN_SIZE = 64 * 1024
+
+
+def read_json_file(path):
+    """读取并解析JSON文件
+    
+    有 orjson 且文件较大时直接解析内存映射的文件内容；小文件映射的开销
+    大于复制，仍整体读取
+    """
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if orjson is None or size < _MMAP_MIN_SIZE:
+            return json_loads(f.read())
+        
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            with memoryview(mm) as view:
+                return orjson.loads(view)
+
+
+def json_dumps(obj) -> bytes:
+    """序列化为缩进格式的UTF-8 JSON字节串，优先使用orjson"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+def write_json_file(path, obj):
+    """将对象以缩进格式写入JSON文件
+    
+    有 orjson 时直接写入其生成的字节串；否则逐段编码写入文件，
+    不在内存中拼出完整的JSON字符串
+    """
+    if orjson is not None:
+        path.write_bytes(json_dumps(obj))
+        return
+    
+    encoder = json.JSONEncoder(indent=2, ensure_ascii=False)
+    with open(path, 'w', encoding='utf-8', buffering=1 << 20) as f:
+        for chunk in encoder.iterencode(obj):
+            f.write(chunk)
+
+
+def atomic_write_bytes(path, data: bytes):
+    """原子写入文件：先写入临时文件再替换，避免中途失败留下残缺文件
+    
+    替换前先将临时文件落盘，系统崩溃后不会出现替换成功但内容为空的文件
+    """
+    tmp_path = path.with_name(path.name + ".tmp")
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise